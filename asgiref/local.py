@@ -1,7 +1,7 @@
 import asyncio
-import contextlib
 import contextvars
 import threading
+import weakref
 from typing import Any, Union
 
 
@@ -20,11 +20,17 @@ class _Storage:
     the points where it *intentionally* moves work between threads (see
     ``asgiref.sync._restore_context``); data merely inherited by an unrelated
     thread is never re-homed and so stays isolated.
+
+    The data itself is an immutable mapping from a ``ContextVar`` per
+    attribute name to its value (or ``_DELETED``). ``contextvars.Context`` is
+    used for this as it is a persistent hash array mapped trie: copying one is
+    O(1), and setting a key in the copy is O(log n) and shares the rest of
+    its structure with the original.
     """
 
     __slots__ = ("thread_id", "data")
 
-    def __init__(self, thread_id: int, data: dict[str, Any]) -> None:
+    def __init__(self, thread_id: int, data: contextvars.Context) -> None:
         self.thread_id = thread_id
         self.data = data
 
@@ -34,6 +40,12 @@ def _rehome(storage: "_Storage") -> "_Storage":
     return _Storage(threading.get_ident(), storage.data)
 
 
+# Marks an attribute deleted in _Storage data, which has no way to remove keys.
+_DELETED = object()
+
+_EMPTY = contextvars.Context()
+
+
 class _CVar:
     """Storage utility for Local."""
 
@@ -41,6 +53,8 @@ class _CVar:
         self._data: "contextvars.ContextVar[_Storage]" = contextvars.ContextVar(
             "asgiref.local"
         )
+        # The key used for each attribute name in the storage data.
+        self._keys: "dict[str, contextvars.ContextVar[Any]]" = {}
 
     def _storage(self) -> "_Storage":
         # Only return storage that belongs to the current thread. Storage with
@@ -48,30 +62,57 @@ class _CVar:
         # intentionally moved here by asgiref) and must not be visible.
         storage = self._data.get(None)
         if storage is None or storage.thread_id != threading.get_ident():
-            return _Storage(threading.get_ident(), {})
+            return _Storage(threading.get_ident(), _EMPTY)
         return storage
 
     def __getattr__(self, key):
-        try:
-            return self._storage().data[key]
-        except KeyError:
-            raise AttributeError(f"{self!r} object has no attribute {key!r}")
+        # Inlined _storage(), as this is on the hot path for Local.
+        storage = self._data.get(None)
+        if storage is not None and storage.thread_id == threading.get_ident():
+            data_key = self._keys.get(key)
+            if data_key is not None:
+                value = storage.data.get(data_key, _DELETED)
+                if value is not _DELETED:
+                    return value
+        raise AttributeError(f"{self!r} object has no attribute {key!r}")
+
+    def _set(self, key: str, value: Any) -> None:
+        data_key = self._keys.get(key)
+        if data_key is None:
+            data_key = self._keys.setdefault(
+                key, contextvars.ContextVar(f"asgiref.local.{key}")
+            )
+        data = self._storage().data.copy()
+        data.run(data_key.set, value)
+        self._data.set(_Storage(threading.get_ident(), data))
 
     def __setattr__(self, key: str, value: Any) -> None:
-        if key == "_data":
+        if key in ("_data", "_keys"):
             return super().__setattr__(key, value)
-
-        data = self._storage().data.copy()
-        data[key] = value
-        self._data.set(_Storage(threading.get_ident(), data))
+        self._set(key, value)
 
     def __delattr__(self, key: str) -> None:
-        data = self._storage().data.copy()
-        if key in data:
-            del data[key]
-            self._data.set(_Storage(threading.get_ident(), data))
-        else:
+        data_key = self._keys.get(key)
+        if data_key is None or self._storage().data.get(data_key, _DELETED) is _DELETED:
             raise AttributeError(f"{self!r} object has no attribute {key!r}")
+        self._set(key, _DELETED)
+
+
+# Guards Local._thread_critical_locals, which other threads may add to while
+# it is being walked.
+_thread_critical_locals_lock = threading.Lock()
+
+
+def _clear_thread_critical_locals() -> None:
+    """Drop the current thread's data from every thread critical Local.
+
+    Used when asgiref reuses a worker thread for unrelated work, so that it
+    starts out as a new thread would.
+    """
+    with _thread_critical_locals_lock:
+        locals_ = list(Local._thread_critical_locals)
+    for local in locals_:
+        local._storage.__dict__.clear()
 
 
 class Local:
@@ -102,67 +143,63 @@ class Local:
     Unlike plain `contextvars` objects, this utility is threadsafe.
     """
 
+    # Every thread critical Local, so worker threads can be reset for reuse.
+    _thread_critical_locals: "weakref.WeakSet[Local]" = weakref.WeakSet()
+
     def __init__(self, thread_critical: bool = False) -> None:
         self._thread_critical = thread_critical
-        self._thread_lock = threading.RLock()
 
         self._storage: "Union[threading.local, _CVar]"
 
         if thread_critical:
             # Thread-local storage
             self._storage = threading.local()
+            with _thread_critical_locals_lock:
+                self._thread_critical_locals.add(self)
         else:
             # Contextvar storage
             self._storage = _CVar()
 
-    @contextlib.contextmanager
-    def _lock_storage(self):
-        # Thread safe access to storage
-        if self._thread_critical:
-            is_async = True
-            try:
-                # this is a test for are we in a async or sync
-                # thread - will raise RuntimeError if there is
-                # no current loop
-                asyncio.get_running_loop()
-            except RuntimeError:
-                is_async = False
-            if not is_async:
-                # We are in a sync thread, the storage is
-                # just the plain thread local (i.e, "global within
-                # this thread" - it doesn't matter where you are
-                # in a call stack you see the same storage)
-                yield self._storage
-            else:
-                # We are in an async thread - storage is still
-                # local to this thread, but additionally should
-                # behave like a context var (is only visible with
-                # the same async call stack)
-
-                # Ensure context exists in the current thread
-                if not hasattr(self._storage, "cvar"):
-                    self._storage.cvar = _CVar()
-
-                # self._storage is a thread local, so the members
-                # can't be accessed in another thread (we don't
-                # need any locks)
-                yield self._storage.cvar
-        else:
-            # Lock for thread_critical=False as other threads
-            # can access the exact same storage object
-            with self._thread_lock:
-                yield self._storage
+    def _get_storage(self):
+        # No locking is needed here. Contextvar storage is copy-on-write and a
+        # context can only be entered by one thread at a time, while thread
+        # local storage is never shared between threads.
+        if not self._thread_critical:
+            return self._storage
+        try:
+            # this is a test for are we in a async or sync
+            # thread - will raise RuntimeError if there is
+            # no current loop
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # We are in a sync thread, the storage is
+            # just the plain thread local (i.e, "global within
+            # this thread" - it doesn't matter where you are
+            # in a call stack you see the same storage)
+            return self._storage
+        # We are in an async thread - storage is still
+        # local to this thread, but additionally should
+        # behave like a context var (is only visible with
+        # the same async call stack)
+
+        # Ensure context exists in the current thread
+        if not hasattr(self._storage, "cvar"):
+            self._storage.cvar = _CVar()
+
+        # self._storage is a thread local, so the members
+        # can't be accessed in another thread (we don't
+        # need any locks)
+        return self._storage.cvar
 
     def __getattr__(self, key):
-        with self._lock_storage() as storage:
-            return getattr(storage, key)
+        if self._thread_critical:
+            return getattr(self._get_storage(), key)
+        return getattr(self._storage, key)
 
     def __setattr__(self, key, value):
-        if key in ("_local", "_storage", "_thread_critical", "_thread_lock"):
+        if key in ("_local", "_storage", "_thread_critical"):
             return super().__setattr__(key, value)
-        with self._lock_storage() as storage:
-            setattr(storage, key, value)
+        setattr(self._get_storage(), key, value)
 
     def __delattr__(self, key):
-        with self._lock_storage() as storage:
-            delattr(storage, key)
+        delattr(self._get_storage(), key)
@@ -1,13 +1,84 @@
 import asyncio
+import bisect
+import hashlib
 import logging
+import multiprocessing
+import os
+import pickle
+import socket
+import struct
 import time
 import traceback
+from collections import OrderedDict
+from typing import Any
 
 from .compatibility import guarantee_single_callable
+from .sync import AsyncToSync
 
 logger = logging.getLogger(__name__)
 
 
+class ApplicationQueue(asyncio.Queue[Any]):
+    """
+    Input queue for a StatelessServer application instance.
+
+    If it has a maxsize, what happens to messages put into it while it is full
+    depends on `overflow`:
+
+    * "block": put() waits for room, and put_nowait() raises QueueFull, as
+      with a plain asyncio.Queue.
+    * "drop_oldest": the oldest message in the queue is dropped to make room.
+    * "drop_newest": the new message is dropped.
+
+    Either way, put() and put_nowait() never block or raise when dropping, and
+    `on_drop` (if given) is called with each dropped message.
+    """
+
+    overflow_policies = ("block", "drop_oldest", "drop_newest")
+
+    def __init__(self, maxsize=0, overflow="block", on_drop=None):
+        if overflow not in self.overflow_policies:
+            raise ValueError(f"Unknown queue overflow policy {overflow!r}")
+        super().__init__(maxsize)
+        self.overflow = overflow
+        self.on_drop = on_drop
+        # How many receive() calls are waiting on the queue
+        self.getters = 0
+
+    async def put(self, item):
+        if self.overflow == "block":
+            return await super().put(item)
+        self.put_nowait(item)
+
+    async def get(self):
+        self.getters += 1
+        try:
+            return await super().get()
+        finally:
+            self.getters -= 1
+
+    @property
+    def idle(self):
+        """
+        True if the queue is empty and the application is waiting on it.
+        """
+        return self.getters > 0 and self.empty()
+
+    def put_nowait(self, item):
+        if self.overflow != "block" and self.full():
+            if self.overflow == "drop_oldest":
+                dropped = self.get_nowait()
+                # It will never be processed, so don't leave join() waiting
+                self.task_done()
+            else:
+                dropped = item
+            if self.on_drop is not None:
+                self.on_drop(dropped)
+            if dropped is item:
+                return
+        super().put_nowait(item)
+
+
 class StatelessServer:
     """
     Base server class that handles basic concepts like application instance
@@ -27,28 +98,59 @@ class StatelessServer:
         "user-123456",
         {"type": "testprotocol", "user_id": "123456", "username": "andrew"},
     )
-    input_queue.put_nowait(message)
+    await input_queue.put(message)
+
+    Each instance's input queue holds at most `max_queue_size` messages (if it
+    is non-zero); `queue_overflow` says what happens to messages that arrive
+    while it is full (see ApplicationQueue). With the default of "block",
+    put() makes handle() wait for the application to catch up, while
+    put_nowait() raises asyncio.QueueFull, so only use put_nowait() if the
+    queues are unbounded or drop messages. application_queue_stats() reports
+    how full the queues are.
 
     If you try and create an application instance and there are already
-    `max_application` instances, the oldest/least recently used one will be
-    reclaimed and shut down to make space.
+    `max_applications` instances, the least recently used one will be
+    reclaimed and shut down to make space. If `idle_timeout` is set,
+    instances are also reclaimed once they have gone that many seconds
+    without being used.
 
-    Application coroutines that error will be found periodically (every 100ms
-    by default) and have their exceptions printed to the console. Override
+    Application instances are removed as soon as their coroutines finish, and
+    any that error have their exceptions printed to the console. Override
     application_exception() if you want to do more when this happens.
-
-    If you override run(), make sure you handle things like launching the
-    application checker.
     """
 
+    # For subclasses that override application_checker()
     application_checker_interval = 0.1
 
-    def __init__(self, application, max_applications=1000):
+    def __init__(
+        self,
+        application,
+        max_applications=1000,
+        idle_timeout=None,
+        max_queue_size=0,
+        queue_overflow="block",
+    ):
+        if queue_overflow not in ApplicationQueue.overflow_policies:
+            raise ValueError(f"Unknown queue overflow policy {queue_overflow!r}")
         # Parameters
         self.application = application
         self.max_applications = max_applications
+        self.idle_timeout = idle_timeout
+        self.max_queue_size = max_queue_size
+        self.queue_overflow = queue_overflow
         # Initialisation
-        self.application_instances = {}
+        # Kept in least to most recently used order, so the instance to
+        # reclaim is always the first one.
+        self.application_instances = OrderedDict()
+        # Running application_exception() calls, so they aren't garbage
+        # collected part way through
+        self.exception_handlers = set()
+        self.idle_timer = None
+        # How many messages have been dropped from full input queues
+        self.dropped_messages = 0
+        # Set by ShardedServer in the process that runs handle(), to pass
+        # messages on to the worker processes
+        self.router = None
 
     ### Mainloop and handling
 
@@ -57,7 +159,7 @@ class StatelessServer:
         Runs the asyncio event loop with our handler loop.
         """
         try:
-            asyncio.run(self.arun())
+            AsyncToSync.run_in_new_loop(self.arun())
         except KeyboardInterrupt:
             logger.info("Exiting due to Ctrl-C/interrupt")
 
@@ -65,7 +167,12 @@ class StatelessServer:
         """
         Runs the asyncio event loop with our handler loop.
         """
+        if type(self).application_checker is StatelessServer.application_checker:
+            await self.handle()
+            return
 
+        # A subclass has its own checker, so run it alongside handle() as
+        # it always has been.
         class Done(Exception):
             pass
 
@@ -93,14 +200,23 @@ class StatelessServer:
         """
         Creates an application instance and returns its queue.
         """
-        if scope_id in self.application_instances:
-            self.application_instances[scope_id]["last_used"] = time.time()
-            return self.application_instances[scope_id]["input_queue"]
-        # See if we need to delete an old one
-        while len(self.application_instances) > self.max_applications:
+        if self.router is not None:
+            return self.router.input_queue(scope_id, scope)
+        details = self.application_instances.get(scope_id)
+        if details is not None:
+            details["last_used"] = time.time()
+            self.application_instances.move_to_end(scope_id)
+            return details["input_queue"]
+        # See if we need to delete an old one to make room
+        while (
+            self.application_instances
+            and len(self.application_instances) >= self.max_applications
+        ):
             self.delete_oldest_application_instance()
         # Make an instance of the application
-        input_queue = asyncio.Queue()
+        input_queue = ApplicationQueue(
+            self.max_queue_size, self.queue_overflow, self.message_dropped
+        )
         application_instance = guarantee_single_callable(self.application)
         # Run it, and stash the future for later checking
         future = asyncio.ensure_future(
@@ -110,27 +226,78 @@ class StatelessServer:
                 send=lambda message: self.application_send(scope, message),
             ),
         )
-        self.application_instances[scope_id] = {
+        details = {
             "input_queue": input_queue,
             "future": future,
             "scope": scope,
             "last_used": time.time(),
         }
+        self.application_instances[scope_id] = details
+        future.add_done_callback(
+            lambda future: self.application_done(scope_id, details)
+        )
+        self.schedule_idle_check()
         return input_queue
 
     def delete_oldest_application_instance(self):
         """
-        Finds and deletes the oldest application instance
+        Finds and deletes the least recently used application instance
+        """
+        self.delete_application_instance(next(iter(self.application_instances)))
+
+    def message_dropped(self, message):
+        """
+        Called with each message dropped because an input queue was full.
         """
-        oldest_time = min(
-            details["last_used"] for details in self.application_instances.values()
+        self.dropped_messages += 1
+
+    def application_queue_stats(self):
+        """
+        Returns metrics on the application instances' input queues: how many
+        messages are waiting in all of them, and in the fullest one, and how
+        many have ever been dropped because a queue was full.
+        """
+        depths = [
+            details["input_queue"].qsize()
+            for details in self.application_instances.values()
+        ]
+        return {
+            "queued": sum(depths),
+            "max_queued": max(depths, default=0),
+            "dropped": self.dropped_messages,
+        }
+
+    def schedule_idle_check(self):
+        """
+        Makes sure delete_idle_application_instances runs when the least
+        recently used instance is due to time out, if it isn't already due to.
+        """
+        if (
+            self.idle_timeout is None
+            or self.idle_timer is not None
+            or not self.application_instances
+        ):
+            return
+        oldest = next(iter(self.application_instances.values()))
+        self.idle_timer = asyncio.get_running_loop().call_later(
+            max(oldest["last_used"] + self.idle_timeout - time.time(), 0),
+            self.delete_idle_application_instances,
         )
-        for scope_id, details in self.application_instances.items():
-            if details["last_used"] == oldest_time:
-                self.delete_application_instance(scope_id)
-                # Return to make sure we only delete one in case two have
-                # the same oldest time
-                return
+
+    def delete_idle_application_instances(self):
+        """
+        Deletes application instances that haven't been used for idle_timeout.
+        """
+        self.idle_timer = None
+        # Instances are in the order they were last used, so only the ones at
+        # the start ever need to be looked at.
+        cutoff = time.time() - self.idle_timeout
+        while self.application_instances:
+            scope_id, details = next(iter(self.application_instances.items()))
+            if details["last_used"] > cutoff:
+                break
+            self.delete_application_instance(scope_id)
+        self.schedule_idle_check()
 
     def delete_application_instance(self, scope_id):
         """
@@ -142,23 +309,30 @@ class StatelessServer:
         if not details["future"].done():
             details["future"].cancel()
 
+    def application_done(self, scope_id, details):
+        """
+        Called when an application instance's Future is done, to clean it up
+        and handle any exception it raised.
+        """
+        # It may have already been removed, and even replaced by a new
+        # instance with the same scope_id
+        if self.application_instances.get(scope_id) is details:
+            del self.application_instances[scope_id]
+        future = details["future"]
+        if not future.cancelled() and future.exception():
+            task = asyncio.ensure_future(
+                self.application_exception(future.exception(), details)
+            )
+            self.exception_handlers.add(task)
+            task.add_done_callback(self.exception_handlers.discard)
+
     async def application_checker(self):
         """
-        Goes through the set of current application instance Futures and cleans up
-        any that are done/prints exceptions for any that errored.
+        Does nothing; application instances are cleaned up as soon as they
+        finish by application_done(). If a subclass overrides it, arun() runs
+        it alongside handle(), and application_checker_interval is there for
+        it to use.
         """
-        while True:
-            await asyncio.sleep(self.application_checker_interval)
-            for scope_id, details in list(self.application_instances.items()):
-                if details["future"].done():
-                    exception = details["future"].exception()
-                    if exception:
-                        await self.application_exception(exception, details)
-                    try:
-                        del self.application_instances[scope_id]
-                    except KeyError:
-                        # Exception handling might have already got here before us. That's fine.
-                        pass
 
     async def application_exception(self, exception, application_details):
         """
@@ -170,3 +344,329 @@ class StatelessServer:
             "".join(traceback.format_tb(exception.__traceback__)),
             f"  {exception}",
         )
+
+
+async def _wait_readable(fd):
+    """
+    Waits until the file descriptor `fd` is readable.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    loop.add_reader(fd, lambda: future.done() or future.set_result(None))
+    try:
+        await future
+    finally:
+        loop.remove_reader(fd)
+
+
+class Channel:
+    """
+    A one-way connection from a ShardedServer to one of its workers, which
+    carries items as length-prefixed pickles between two non-blocking file
+    descriptors.
+
+    Sending never blocks the event loop: items that can't be written yet are
+    buffered, and written as the worker reads. send() waits, and
+    send_nowait() doesn't, while more than `high_water_mark` bytes are
+    buffered.
+    """
+
+    header = struct.Struct("!I")
+    high_water_mark = 2**16
+
+    def __init__(self, receiver, sender):
+        os.set_blocking(receiver, False)
+        os.set_blocking(sender, False)
+        self.receiver = receiver
+        self.sender = sender
+        self.received = bytearray()
+        self.unsent = bytearray()
+        self.writing = False
+        # Futures waiting for the buffer to go below the high water mark
+        self.drain_waiters = []
+        self.send_error = None
+
+    def send_nowait(self, item):
+        if self.send_error is not None:
+            raise self.send_error
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        self.unsent += self.header.pack(len(data))
+        self.unsent += data
+        if not self.writing:
+            self.write()
+
+    async def send(self, item):
+        self.send_nowait(item)
+        if len(self.unsent) > self.high_water_mark:
+            await self.drain(self.high_water_mark)
+
+    async def drain(self, limit=0):
+        """
+        Waits until at most `limit` bytes are waiting to be written.
+        """
+        while len(self.unsent) > limit and self.send_error is None:
+            future = asyncio.get_running_loop().create_future()
+            self.drain_waiters.append(future)
+            await future
+        if self.send_error is not None:
+            raise self.send_error
+
+    def write(self):
+        """
+        Writes as much of the buffer as the worker has room for, and makes
+        sure this is called again when it has room for more.
+        """
+        try:
+            while self.unsent:
+                del self.unsent[: os.write(self.sender, self.unsent)]
+        except BlockingIOError:
+            pass
+        except OSError as error:
+            self.send_error = error
+            self.unsent.clear()
+        loop = asyncio.get_running_loop()
+        if self.unsent and not self.writing:
+            loop.add_writer(self.sender, self.write)
+            self.writing = True
+        elif not self.unsent and self.writing:
+            loop.remove_writer(self.sender)
+            self.writing = False
+        waiters, self.drain_waiters = self.drain_waiters, []
+        for future in waiters:
+            if not future.done():
+                future.set_result(None)
+
+    async def receive(self):
+        """
+        Returns the next item sent, or raises EOFError once the sending end
+        has been closed.
+        """
+        header_size = self.header.size
+        while True:
+            if len(self.received) >= header_size:
+                (length,) = self.header.unpack_from(self.received)
+                if len(self.received) >= header_size + length:
+                    item = pickle.loads(
+                        self.received[header_size : header_size + length]
+                    )
+                    del self.received[: header_size + length]
+                    return item
+            try:
+                data = os.read(self.receiver, 2**16)
+            except BlockingIOError:
+                await _wait_readable(self.receiver)
+                continue
+            if not data:
+                raise EOFError("Channel closed")
+            self.received += data
+
+    def close_sender(self):
+        if self.sender is not None:
+            os.close(self.sender)
+            self.sender = None
+
+    def close_receiver(self):
+        if self.receiver is not None:
+            os.close(self.receiver)
+            self.receiver = None
+
+
+class PipeTransport:
+    """
+    Carries messages from a ShardedServer to its workers over pipes.
+    """
+
+    def channel(self):
+        receiver, sender = os.pipe()
+        return Channel(receiver, sender)
+
+
+class UnixSocketTransport:
+    """
+    Carries messages from a ShardedServer to its workers over Unix socket
+    pairs.
+    """
+
+    def channel(self):
+        receiver, sender = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        return Channel(receiver.detach(), sender.detach())
+
+
+class ShardQueue:
+    """
+    Stands in for an application instance's input queue in the process
+    running a ShardedServer's handle(), sending messages on to the worker
+    that runs the instance.
+    """
+
+    def __init__(self, channel, scope_id, scope):
+        self.channel = channel
+        self.scope_id = scope_id
+        self.scope = scope
+
+    def put_nowait(self, message):
+        self.channel.send_nowait((self.scope_id, self.scope, message))
+
+    async def put(self, message):
+        await self.channel.send((self.scope_id, self.scope, message))
+
+
+class ShardedServer:
+    """
+    Runs a StatelessServer's application instances across several forked
+    worker processes, rather than all on one event loop.
+
+    The server's handle() runs in this process as normal. Each scope_id is
+    given to one worker, picked by consistent hashing, and every message for
+    that scope_id is sent on to that worker to be put into the application
+    instance's input queue there; the server's other settings, and its
+    application_send(), apply within each worker. Workers are forked, so they
+    inherit any sockets the server has already opened to send with.
+
+    `transport` says how messages get to the workers (PipeTransport, the
+    default, or UnixSocketTransport); scopes and messages must be picklable.
+    If a worker falls behind, messages for it are buffered in this process,
+    and `await input_queue.put(message)` waits (without blocking the event
+    loop) until the worker has caught up on them.
+
+    Once handle() finishes, each worker gives its application instances up to
+    `shutdown_timeout` seconds to handle the messages they have been sent and
+    go back to waiting on receive(), and then shuts them down.
+    """
+
+    def __init__(
+        self, server, workers=None, transport=None, replicas=64, shutdown_timeout=10
+    ):
+        self.server = server
+        self.workers = workers or os.cpu_count() or 1
+        self.transport = transport or PipeTransport()
+        self.shutdown_timeout = shutdown_timeout
+        # The consistent hash ring, as sorted hashes and the worker each
+        # one belongs to, with `replicas` points per worker.
+        points = sorted(
+            (self.hash(f"{worker}-{replica}"), worker)
+            for worker in range(self.workers)
+            for replica in range(replicas)
+        )
+        self.ring_hashes = [point for point, _ in points]
+        self.ring_workers = [worker for _, worker in points]
+        self.channels = []
+        self.processes = []
+
+    @staticmethod
+    def hash(key):
+        """
+        Hashes a key to an integer, the same way in every process (unlike
+        the builtin hash()).
+        """
+        digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def worker_for(self, scope_id):
+        """
+        Returns the index of the worker that runs scope_id's instance.
+        """
+        index = bisect.bisect(self.ring_hashes, self.hash(scope_id))
+        return self.ring_workers[index % len(self.ring_workers)]
+
+    def input_queue(self, scope_id, scope):
+        """
+        Returns a queue that sends messages to scope_id's worker; used in
+        place of get_or_create_application_instance() in this process.
+        """
+        return ShardQueue(self.channels[self.worker_for(scope_id)], scope_id, scope)
+
+    def run(self):
+        """
+        Starts the workers, runs the server's handler loop, and then stops
+        the workers once it finishes.
+        """
+        self.start()
+        try:
+            AsyncToSync.run_in_new_loop(self.arun())
+        except KeyboardInterrupt:
+            logger.info("Exiting due to Ctrl-C/interrupt")
+        finally:
+            self.stop()
+
+    async def arun(self):
+        """
+        Runs the server's handler loop, and then sends on any messages that
+        are still waiting to go to the workers.
+        """
+        await self.server.arun()
+        for channel in self.channels:
+            await channel.drain()
+
+    def start(self):
+        """
+        Forks the worker processes.
+        """
+        context = multiprocessing.get_context("fork")
+        self.channels = [self.transport.channel() for _ in range(self.workers)]
+        for index in range(self.workers):
+            process = context.Process(
+                target=self.worker_main,
+                args=(index,),
+                name=f"asgiref-shard-{index}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        for channel in self.channels:
+            channel.close_receiver()
+        self.server.router = self
+
+    def stop(self):
+        """
+        Tells the workers there are no more messages, and waits for them to
+        shut down.
+        """
+        self.server.router = None
+        for channel in self.channels:
+            channel.close_sender()
+        for process in self.processes:
+            process.join()
+        self.channels = []
+        self.processes = []
+
+    def worker_main(self, index):
+        """
+        Entry point of a worker process.
+        """
+        # Close everything but our own receiving end, so we see the channel
+        # close when the parent closes it.
+        for other, channel in enumerate(self.channels):
+            channel.close_sender()
+            if other != index:
+                channel.close_receiver()
+        try:
+            AsyncToSync.run_in_new_loop(self.run_worker(self.channels[index]))
+        except KeyboardInterrupt:
+            pass
+
+    async def run_worker(self, channel):
+        """
+        Puts messages from the channel into application instances' input
+        queues until it is closed, then waits for the instances to finish or
+        be idle (up to shutdown_timeout) before shutting them down.
+        """
+        server = self.server
+        try:
+            while True:
+                try:
+                    scope_id, scope, message = await channel.receive()
+                except EOFError:
+                    break
+                await server.get_or_create_application_instance(scope_id, scope).put(
+                    message
+                )
+            deadline = time.monotonic() + self.shutdown_timeout
+            while time.monotonic() < deadline and not all(
+                details["input_queue"].idle
+                for details in server.application_instances.values()
+            ):
+                await asyncio.sleep(0.01)
+        finally:
+            for scope_id in list(server.application_instances):
+                server.delete_application_instance(scope_id)
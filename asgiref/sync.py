@@ -6,16 +6,18 @@ import inspect
 import os
 import sys
 import threading
+import time
 import warnings
 import weakref
-from collections.abc import Awaitable, Callable, Coroutine
-from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from collections import deque
+from collections.abc import Awaitable, Callable, Coroutine, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import (
     TYPE_CHECKING,
     Any,
     Dict,
     Generic,
-    List,
+    Literal,
     Optional,
     ParamSpec,
     TypeVar,
@@ -23,7 +25,7 @@ from typing import (
 )
 
 from .current_thread_executor import CurrentThreadExecutor
-from .local import Local, _rehome, _Storage
+from .local import Local, _clear_thread_critical_locals, _rehome, _Storage
 
 if TYPE_CHECKING:
     # This is not available to import at runtime
@@ -32,24 +34,42 @@ if TYPE_CHECKING:
 _F = TypeVar("_F", bound=Callable[..., Any])
 _P = ParamSpec("_P")
 _R = TypeVar("_R")
+_T = TypeVar("_T")
+
+# Sentinel for a contextvar that has no value in a context.
+_MISSING = object()
 
 
 def _restore_context(context: contextvars.Context) -> None:
     # Check for changes in contextvars, and set them to the current
-    # context for downstream consumers
-    for cvar in context:
-        cvalue = context.get(cvar)
+    # context for downstream consumers.
+    #
+    # Contexts are immutable mappings, so taking a snapshot of the current one
+    # is cheap, and values that weren't touched since ``context`` was copied
+    # from it (or vice versa) are the very same objects. Comparing by identity
+    # means only variables that actually changed are set, and never calls an
+    # arbitrary __eq__.
+    current = contextvars.copy_context()
+    thread_id = threading.get_ident()
+    for cvar, cvalue in context.items():
+        current_value = current.get(cvar, _MISSING)
         # asgiref is deliberately moving this context onto the current thread,
         # so re-home any Local storage to it. This keeps Local data visible
         # across async_to_sync / sync_to_async boundaries while leaving data
         # merely inherited by an unrelated thread isolated (see asgiref.local).
         if isinstance(cvalue, _Storage):
-            cvalue = _rehome(cvalue)
-        try:
-            if cvar.get() != cvalue:
-                cvar.set(cvalue)
-        except LookupError:
-            cvar.set(cvalue)
+            if (
+                isinstance(current_value, _Storage)
+                and current_value.data is cvalue.data
+                and current_value.thread_id == thread_id
+            ):
+                # Unchanged, and already visible to this thread.
+                continue
+            if cvalue.thread_id != thread_id:
+                cvalue = _rehome(cvalue)
+        elif current_value is cvalue:
+            continue
+        cvar.set(cvalue)
 
 
 # Python 3.12 deprecates asyncio.iscoroutinefunction() as an alias for
@@ -107,6 +127,126 @@ class AsyncSingleThreadContext:
         AsyncToSync.async_single_thread_context.reset(self.token)
 
 
+def _reset_worker_thread() -> None:
+    # Make a recycled worker thread look like a new one to the code it runs
+    # next: forget the event loop thread_handler recorded for AsyncToSync,
+    # and drop this thread's data from every thread critical Local.
+    SyncToAsync.threadlocal.__dict__.clear()
+    _clear_thread_critical_locals()
+
+
+class ThreadSensitivePool:
+    """
+    A pool of single-thread executors for ThreadSensitiveContext.
+
+    Each context that runs thread sensitive code is pinned to one worker
+    thread from the pool for as long as it is open, so all its sync code
+    still runs in the same thread. When the context exits, the worker
+    finishes anything still queued for it, has asgiref's thread-local state
+    (such as thread critical Local data) cleared, and is reused for the next
+    context rather than a new thread being started.
+
+    If max_workers is set, once that many workers are pinned, further
+    contexts wait for one to be released rather than starting ever more
+    threads. Up to max_idle_workers (by default, max_workers or 32) released
+    workers are kept for reuse; any more are shut down.
+
+    Usage:
+
+    >>> ThreadSensitiveContext.pool = ThreadSensitivePool(max_workers=8)
+    """
+
+    # Makes sure only one thread resets a pool after a fork. It can't be the
+    # pool's own lock, as that is replaced by the reset - a forked process
+    # may have inherited it locked by a thread that doesn't exist there.
+    reset_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_idle_workers: int | None = None,
+    ) -> None:
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be greater than 0")
+        self.max_workers = max_workers
+        if max_idle_workers is None:
+            max_idle_workers = 32 if max_workers is None else max_workers
+        self.max_idle_workers = max_idle_workers
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forgets all workers, for use in a forked process where their threads
+        no longer exist.
+        """
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.idle_workers: list[ThreadPoolExecutor] = []
+        self.num_workers = 0  # synchronized by lock
+        self.waiters: "deque[Future[ThreadPoolExecutor]]" = deque()
+
+    async def acquire(self) -> ThreadPoolExecutor:
+        """
+        Returns an idle worker, waiting for one if they are all in use.
+        """
+        # We make sure the pool is from the same process - if they've forked,
+        # its workers are not going to be valid any more (see #194)
+        if self.pid != os.getpid():
+            with self.reset_lock:
+                # Another thread may have reset it while we waited.
+                if self.pid != os.getpid():
+                    self.reset()
+        with self.lock:
+            if self.idle_workers:
+                return self.idle_workers.pop()
+            if self.max_workers is None or self.num_workers < self.max_workers:
+                self.num_workers += 1
+                return ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="asgiref-thread-sensitive"
+                )
+            waiter: "Future[ThreadPoolExecutor]" = Future()
+            self.waiters.append(waiter)
+        try:
+            return await asyncio.wrap_future(waiter)
+        except asyncio.CancelledError:
+            with self.lock:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+                    waiter.cancel()
+            # If a worker was handed over as we were cancelled, pass it on.
+            if waiter.done() and not waiter.cancelled():
+                self.put(waiter.result())
+            raise
+
+    def release(self, executor: ThreadPoolExecutor) -> "Future[None]":
+        """
+        Resets a worker once it has finished the work already queued on it,
+        then hands it to the next waiting context or returns it to the pool.
+        Safe to call from any thread; returns a Future for the reset.
+        """
+        reset = executor.submit(_reset_worker_thread)
+        reset.add_done_callback(lambda _: self.put(executor))
+        return reset
+
+    def put(self, executor: ThreadPoolExecutor) -> None:
+        """
+        Hands an idle worker to the next waiting context, or returns it to the
+        pool.
+        """
+        with self.lock:
+            while self.waiters:
+                waiter = self.waiters.popleft()
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(executor)
+                    return
+            if len(self.idle_workers) < self.max_idle_workers:
+                self.idle_workers.append(executor)
+                return
+            self.num_workers -= 1
+        # This may be running in the worker thread itself, so don't wait.
+        executor.shutdown(wait=False)
+
+
 class ThreadSensitiveContext:
     """Async context manager to manage context for thread sensitive mode
 
@@ -114,8 +254,13 @@ class ThreadSensitiveContext:
     thread sensitive mode. By default, a single thread pool executor is shared
     within a process.
 
-    The ThreadSensitiveContext() context manager may be used to specify a
-    thread pool per context.
+    The ThreadSensitiveContext() context manager may be used to give each
+    context a thread of its own, taken from a ThreadSensitivePool - the one
+    passed as the pool argument, or ThreadSensitiveContext.pool. By default
+    that pool starts a new thread for every context and shuts it down when
+    the context exits, so no thread-local data can pass from one context to
+    the next; set ThreadSensitiveContext.pool to a ThreadSensitivePool with
+    idle workers to reuse threads instead.
 
     This context manager is re-entrant, so only the outer-most call to
     ThreadSensitiveContext will set the context.
@@ -127,8 +272,18 @@ class ThreadSensitiveContext:
     ...     await sync_to_async(time.sleep, 1)()
     """
 
-    def __init__(self):
+    # Pool of workers to pin contexts to. Keeping no idle workers means each
+    # context gets a brand new thread.
+    pool = ThreadSensitivePool(max_idle_workers=0)
+
+    def __init__(self, pool: ThreadSensitivePool | None = None):
         self.token = None
+        if pool is not None:
+            self.pool = pool
+        self.worker_lock = asyncio.Lock()
+        self.worker_release: (
+            "Optional[weakref.finalize[[ThreadPoolExecutor], ThreadSensitiveContext]]"
+        ) = None
 
     async def __aenter__(self):
         try:
@@ -144,24 +299,164 @@ class ThreadSensitiveContext:
 
         executor = SyncToAsync.context_to_thread_executor.pop(self, None)
         SyncToAsync.thread_sensitive_context.reset(self.token)
-        if executor:
+        if executor and self.worker_release is not None:
             # The executor's worker thread may itself be waiting for this
-            # event loop, so a blocking shutdown() here would deadlock it.
-            # Join in a dedicated thread, not the loop's default executor:
-            # work queued there may itself be needed to unpark the worker,
-            # and joins occupying its slots would starve it.
-            future: "Future[None]" = Future()
-
-            def join() -> None:
-                executor.shutdown()
-                try:
-                    future.set_result(None)
-                except InvalidStateError:
-                    # The await below was cancelled while we were joining.
-                    pass
+            # event loop, so wait for it to finish its work and be released
+            # without blocking the loop (and don't let cancellation hand the
+            # worker on early).
+            await asyncio.shield(asyncio.wrap_future(self.worker_release()))
+
+    async def acquire_worker(self) -> ThreadPoolExecutor:
+        """
+        Pins this context to a worker from its pool, waiting for one to be
+        free if needed.
+        """
+        async with self.worker_lock:
+            executor = SyncToAsync.context_to_thread_executor.get(self)
+            if executor is None:
+                executor = await self.pool.acquire()
+                SyncToAsync.context_to_thread_executor[self] = executor
+                # Released on exit, or if this context is garbage collected
+                # first (e.g. tasks using it outlived the async with block).
+                self.worker_release = weakref.finalize(
+                    self, self.pool.release, executor
+                )
+        return executor
+
+
+class _PersistentLoop:
+    """
+    An event loop running forever in a daemon thread, so AsyncToSync can
+    reuse it across calls rather than starting a new loop in a new thread
+    each time.
+
+    As asyncio.run() would, each call cancels any tasks it started (directly
+    or through tasks of its own) that are still running when it finishes.
+
+    The loop is stopped once this object is garbage collected.
+    """
+
+    # The tasks started by each call so far, keyed by every task in the call.
+    call_tasks: (
+        "weakref.WeakKeyDictionary[asyncio.Future[Any], set[asyncio.Future[Any]]]"
+    ) = weakref.WeakKeyDictionary()
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.loop = AsyncToSync.new_event_loop()
+        self.loop.set_task_factory(
+            functools.partial(self._create_task, self.loop.get_task_factory())
+        )
+        threading.Thread(
+            target=self._run, args=(self.loop,), name="asgiref-loop", daemon=True
+        ).start()
+        weakref.finalize(self, self.loop.call_soon_threadsafe, self.loop.stop)
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    @classmethod
+    def _create_task(
+        cls,
+        task_factory: Any,
+        loop: asyncio.AbstractEventLoop,
+        coro: Any,
+        **kwargs: Any,
+    ) -> "asyncio.Future[Any]":
+        if task_factory is None:
+            task: "asyncio.Future[Any]" = asyncio.Task(coro, loop=loop, **kwargs)
+        else:
+            task = task_factory(loop, coro, **kwargs)
+        parent = asyncio.current_task(loop)
+        tasks = None if parent is None else cls.call_tasks.get(parent)
+        if tasks is not None:
+            tasks.add(task)
+            cls.call_tasks[task] = tasks
+            task.add_done_callback(tasks.discard)
+        return task
+
+    @classmethod
+    async def _run_call(cls, awaitable: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        tasks: "set[asyncio.Future[Any]]" = set()
+        cls.call_tasks[task] = tasks
+        try:
+            await awaitable
+        finally:
+            del cls.call_tasks[task]
+            pending = [future for future in tasks if not future.done()]
+            for future in pending:
+                future.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def submit(self, awaitable: Coroutine[Any, Any, None]) -> "Future[None]":
+        return asyncio.run_coroutine_threadsafe(self._run_call(awaitable), self.loop)
 
-            threading.Thread(target=join, daemon=True).start()
-            await asyncio.wrap_future(future)
+
+class ThreadHop:
+    """
+    Timing of a single SyncToAsync call, as it crosses to the thread that runs
+    the sync function and back again. Passed to each of
+    SyncToAsync.thread_hop_listeners as ``listener(event, hop)``.
+
+    The events, in order, are "submitted" (handed to the executor, on the
+    event loop), "started" and "finished" (on the thread running the sync
+    function), and "delivered" (the result or exception is back on the event
+    loop). The timestamp of each event is stored in the attribute of the same
+    name, from time.perf_counter(), and is None until the event happens, so
+    "started" minus "submitted" is time spent queueing for the executor, and
+    "finished" minus "started" is time spent running.
+
+    ``executor`` is the executor the call was submitted to, or None for the
+    event loop's default executor. Listeners are called on the thread where
+    the event happens, so must be threadsafe and fast, and must not raise.
+    """
+
+    __slots__ = (
+        "func_name",
+        "executor",
+        "submitted",
+        "started",
+        "finished",
+        "delivered",
+    )
+
+    def __init__(self, func_name: str, executor: Any) -> None:
+        self.func_name = func_name
+        self.executor = executor
+        self.submitted: float | None = None
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.delivered: float | None = None
+
+    def event(self, name: str) -> None:
+        setattr(self, name, time.perf_counter())
+        for listener in SyncToAsync.thread_hop_listeners:
+            listener(name, self)
+
+    def wrap(
+        self, func: Callable[[Callable[[], _R]], _R]
+    ) -> Callable[[Callable[[], _R]], _R]:
+        """
+        Wraps the function run on the worker thread to record its start and
+        finish.
+        """
+
+        def wrapper(child: Callable[[], _R]) -> _R:
+            self.event("started")
+            try:
+                return func(child)
+            finally:
+                self.event("finished")
+
+        return wrapper
 
 
 class AsyncToSync(Generic[_P, _R]):
@@ -170,7 +465,8 @@ class AsyncToSync(Generic[_P, _R]):
     the event loop into a synchronous callable that works in a subthread.
 
     If the call stack contains an async loop, the code runs there.
-    Otherwise, the code runs in a new loop in a new thread.
+    Otherwise, the code runs in a new loop in a new thread, or in a
+    long-lived loop thread if persistent_loop is set.
 
     Either way, this thread then pauses and waits to run any thread_sensitive
     code called from further down the call stack using SyncToAsync, before
@@ -193,6 +489,23 @@ class AsyncToSync(Generic[_P, _R]):
         "weakref.WeakKeyDictionary[AsyncSingleThreadContext, ThreadPoolExecutor]"
     ) = weakref.WeakKeyDictionary()
 
+    # Opt-in reuse of a long-lived event loop thread for calls that have no
+    # outer event loop to run on. None starts a new loop in a new thread for
+    # every call, "thread" keeps one loop per calling thread, and "process"
+    # shares a single loop between all threads in the process.
+    persistent_loop: "Optional[Literal['thread', 'process']]" = None
+
+    # Makes the event loops asgiref starts itself - for async_to_sync calls
+    # with no outer event loop, and in asgiref.server - such as
+    # uvloop.new_event_loop. None uses asyncio's default. Set it before any
+    # persistent loop is started, as they are kept for the life of the process.
+    loop_factory: "Optional[Callable[[], asyncio.AbstractEventLoop]]" = None
+
+    # Storage for the persistent loops themselves.
+    process_loop: "Optional[_PersistentLoop]" = None
+    thread_loops = threading.local()
+    process_loop_lock = threading.Lock()
+
     def __init__(
         self,
         awaitable: Callable[_P, Coroutine[Any, Any, _R]] | Callable[_P, Awaitable[_R]],
@@ -314,13 +627,33 @@ class AsyncToSync(Generic[_P, _R]):
                         self.context_to_thread_executor[single_thread_context] = (
                             loop_executor
                         )
+                elif self.persistent_loop is not None and not self.force_new_loop:
+                    # Reuse a long-lived event loop running in its own thread.
+                    # A process-wide loop is shared by every sync thread, so
+                    # it can't be claimed by this one in loop_thread_executors.
+                    if self.persistent_loop == "process":
+                        loop_future = self.get_process_loop().submit(awaitable)
+                    else:
+                        loop_future = self.get_thread_loop().submit(new_loop_wrap())
                 else:
                     # Make our own event loop - in a new thread - and run inside that.
                     loop_executor = ThreadPoolExecutor(max_workers=1)
 
-                loop_future = loop_executor.submit(asyncio.run, new_loop_wrap())
-                # Run the CurrentThreadExecutor until the future is done.
-                current_executor.run_until_future(loop_future)
+                if loop_executor is not None:
+                    loop_future = loop_executor.submit(
+                        self.run_in_new_loop, new_loop_wrap()
+                    )
+                # Thread-sensitive code run in this thread during the call will
+                # record our loop as its main event loop. Don't let that leak
+                # into later calls, which may find a persistent loop still
+                # running and skip the loop_thread_executors registration.
+                threadlocal_state = SyncToAsync.threadlocal.__dict__.copy()
+                try:
+                    # Run the CurrentThreadExecutor until the future is done.
+                    current_executor.run_until_future(loop_future)
+                finally:
+                    SyncToAsync.threadlocal.__dict__.clear()
+                    SyncToAsync.threadlocal.__dict__.update(threadlocal_state)
                 # Wait for future and/or allow for exception propagation
                 loop_future.result()
         finally:
@@ -338,11 +671,68 @@ class AsyncToSync(Generic[_P, _R]):
         func = functools.partial(self.__call__, parent)
         return functools.update_wrapper(func, self.awaitable)
 
+    @classmethod
+    def new_event_loop(cls) -> asyncio.AbstractEventLoop:
+        """
+        Returns a new event loop, made by loop_factory if it is set.
+        """
+        if cls.loop_factory is None:
+            return asyncio.new_event_loop()
+        return cls.loop_factory()
+
+    @classmethod
+    def run_in_new_loop(cls, main: Coroutine[Any, Any, _T]) -> _T:
+        """
+        Runs a coroutine to completion in a new event loop, as asyncio.run()
+        does, but with the loop made by loop_factory if it is set.
+        """
+        if cls.loop_factory is None:
+            return asyncio.run(main)
+        if sys.version_info >= (3, 11):
+            with asyncio.Runner(loop_factory=cls.loop_factory) as runner:
+                return runner.run(main)
+        loop = cls.loop_factory()
+        try:
+            asyncio.set_event_loop(loop)
+            return loop.run_until_complete(main)
+        finally:
+            # Tidy up as asyncio.run() does.
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    @classmethod
+    def get_process_loop(cls) -> _PersistentLoop:
+        """
+        Returns the persistent loop shared by all threads, starting it if
+        needed (or if the process has forked since it was started).
+        """
+        with cls.process_loop_lock:
+            if cls.process_loop is None or cls.process_loop.pid != os.getpid():
+                cls.process_loop = _PersistentLoop()
+            return cls.process_loop
+
+    @classmethod
+    def get_thread_loop(cls) -> _PersistentLoop:
+        """
+        Returns the persistent loop for the current thread, starting it if
+        needed. It is stopped when the thread exits.
+        """
+        persistent_loop = getattr(cls.thread_loops, "loop", None)
+        if persistent_loop is None or persistent_loop.pid != os.getpid():
+            persistent_loop = cls.thread_loops.loop = _PersistentLoop()
+        return persistent_loop
+
     async def main_wrap(
         self,
         call_result: "Future[_R]",
         exc_info: "OptExcInfo",
-        task_context: "Optional[List[asyncio.Task[Any]]]",
+        task_context: "Optional[list[asyncio.Task[Any]]]",
         context: list[contextvars.Context],
         awaitable: Coroutine[Any, Any, _R] | Awaitable[_R],
     ) -> None:
@@ -426,6 +816,10 @@ class SyncToAsync(Generic[_P, _R]):
         "weakref.WeakKeyDictionary[ThreadSensitiveContext, ThreadPoolExecutor]"
     ) = weakref.WeakKeyDictionary()
 
+    # Callables notified of each step of every call, for instrumentation (see
+    # ThreadHop). Timing is only recorded while this is non-empty.
+    thread_hop_listeners: "list[Callable[[str, ThreadHop], None]]" = []
+
     def __init__(
         self,
         func: Callable[_P, _R],
@@ -473,9 +867,8 @@ class SyncToAsync(Generic[_P, _R]):
                     # Re-use thread executor in current context
                     executor = self.context_to_thread_executor[thread_sensitive_context]
                 else:
-                    # Create new thread executor in current context
-                    executor = ThreadPoolExecutor(max_workers=1)
-                    self.context_to_thread_executor[thread_sensitive_context] = executor
+                    # Pin the context to a worker thread from its pool
+                    executor = await thread_sensitive_context.acquire_worker()
             elif loop in AsyncToSync.loop_thread_executors:
                 # Re-use thread executor for running loop
                 executor = AsyncToSync.loop_thread_executors[loop]
@@ -496,10 +889,12 @@ class SyncToAsync(Generic[_P, _R]):
         # and kwargs bound.
         child = functools.partial(self.func, *args, **kwargs)
 
-        # On the worker thread, thread_handler runs ``func(child)``. ``func``
+        # On the worker thread, thread_handler runs ``func(child)`` (wrapped
+        # by ThreadHop.wrap if there are thread_hop_listeners). ``func``
         # enters ``context`` (via context.run); then, inside it, ``run_child``
         # re-homes any Local storage to the worker thread so it stays visible
         # there (see _restore_context), and finally calls ``child``.
+
         def func(child: Callable[[], _R]) -> _R:
             def run_child() -> _R:
                 _restore_context(context)
@@ -507,6 +902,15 @@ class SyncToAsync(Generic[_P, _R]):
 
             return context.run(run_child)
 
+        hop = None
+        handler_func: Callable[[Callable[[], _R]], _R] = func
+        if self.thread_hop_listeners:
+            hop = ThreadHop(
+                getattr(self.func, "__qualname__", repr(self.func)), executor
+            )
+            handler_func = hop.wrap(func)
+            hop.event("submitted")
+
         task_context: list[asyncio.Task[Any]] = []
 
         # Run the code in the right thread
@@ -517,7 +921,7 @@ class SyncToAsync(Generic[_P, _R]):
                 loop,
                 sys.exc_info(),
                 task_context,
-                func,
+                handler_func,
                 child,
             ),
         )
@@ -542,9 +946,13 @@ class SyncToAsync(Generic[_P, _R]):
                 exec_coro.cancel()
             ret = await exec_coro
         finally:
+            # _restore_context compares values by identity, so this never
+            # calls an __eq__ on them.
             if self.context is None:
                 _restore_context(context)
             self.deadlock_context.set(False)
+            if hop is not None:
+                hop.event("delivered")
 
         return ret
 
@@ -665,3 +1073,74 @@ def sync_to_async(
         executor=executor,
         context=context,
     )
+
+
+@overload
+async def sync_to_async_batch(
+    funcs: Iterable[Callable[[], _R]],
+    *,
+    thread_sensitive: bool = True,
+    executor: Optional["ThreadPoolExecutor"] = None,
+    context: contextvars.Context | None = None,
+    return_exceptions: Literal[False] = False,
+) -> list[_R]: ...
+
+
+@overload
+async def sync_to_async_batch(
+    funcs: Iterable[Callable[[], _R]],
+    *,
+    thread_sensitive: bool = True,
+    executor: Optional["ThreadPoolExecutor"] = None,
+    context: contextvars.Context | None = None,
+    return_exceptions: bool,
+) -> list[_R | Exception]: ...
+
+
+async def sync_to_async_batch(
+    funcs: Iterable[Callable[[], _R]],
+    *,
+    thread_sensitive: bool = True,
+    executor: Optional["ThreadPoolExecutor"] = None,
+    context: contextvars.Context | None = None,
+    return_exceptions: bool = False,
+) -> list[_R] | list[_R | Exception]:
+    """
+    Runs several sync callables, one after the other, in a single trip to
+    the thread that sync_to_async would run them in, and returns their
+    results in order.
+
+    This pays the cost of crossing to the sync thread (and copying context
+    back and forth) once, rather than once per callable. Use
+    functools.partial to bind arguments.
+
+    If return_exceptions is False, the first exception raised stops the
+    batch and is propagated; otherwise exceptions are returned in place of
+    results, as with asyncio.gather().
+    """
+    funcs = list(funcs)
+    for func in funcs:
+        if (
+            not callable(func)
+            or iscoroutinefunction(func)
+            or iscoroutinefunction(getattr(func, "__call__", func))
+        ):
+            raise TypeError("sync_to_async can only be applied to sync functions.")
+
+    def run_batch() -> list[_R | Exception]:
+        results: list[_R | Exception] = []
+        for func in funcs:
+            try:
+                results.append(func())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    return await SyncToAsync(
+        run_batch,
+        thread_sensitive=thread_sensitive,
+        executor=executor,
+        context=context,
+    )()
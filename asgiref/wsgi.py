@@ -1,18 +1,62 @@
+import asyncio
+import os
+import queue
+import stat
 import sys
-from collections import defaultdict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
 from tempfile import SpooledTemporaryFile
 
 from asgiref.sync import AsyncToSync, sync_to_async
 
+# Environ keys for header names that have been seen before, as header names
+# repeat across requests. It is bounded so that clients can't grow it forever
+# by sending made-up headers.
+_header_environ_keys = {
+    b"content-length": "CONTENT_LENGTH",
+    b"content-type": "CONTENT_TYPE",
+}
+_HEADER_ENVIRON_KEYS_MAX = 1024
+
+
+def _header_environ_key(name):
+    """
+    Returns the WSGI environ key for a header name given as bytes.
+    """
+    key = name.decode("latin1").upper().replace("-", "_")
+    if key not in ("CONTENT_LENGTH", "CONTENT_TYPE") or b"_" in name:
+        key = "HTTP_%s" % key
+    if len(_header_environ_keys) < _HEADER_ENVIRON_KEYS_MAX:
+        _header_environ_keys[name] = key
+    return key
+
 
 class WsgiToAsgi:
     """
     Wraps a WSGI application to make it into an ASGI application.
     """
 
-    def __init__(self, wsgi_application, duplicate_header_limit=100):
+    def __init__(
+        self,
+        wsgi_application,
+        duplicate_header_limit=100,
+        stream_request_body=False,
+        response_buffer_size=0,
+        response_buffer_delay=0.01,
+        send_high_water_mark=None,
+        thread_pool=None,
+    ):
         self.wsgi_application = wsgi_application
         self.duplicate_header_limit = duplicate_header_limit
+        self.stream_request_body = stream_request_body
+        self.response_buffer_size = response_buffer_size
+        self.response_buffer_delay = response_buffer_delay
+        self.send_high_water_mark = send_high_water_mark
+        self.thread_pool = thread_pool
+        # The parts of the environ that are the same for every request on a
+        # server, keyed by (server, scheme, http_version). Shared by instances.
+        self.environ_templates = {}
 
     async def __call__(self, scope, receive, send):
         """
@@ -20,97 +64,452 @@ class WsgiToAsgi:
         We return a new WsgiToAsgiInstance here with the WSGI app
         and the scope, ready to respond when it is __call__ed.
         """
-        await WsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit)(
-            scope, receive, send
+        await WsgiToAsgiInstance(
+            self.wsgi_application,
+            self.duplicate_header_limit,
+            stream_request_body=self.stream_request_body,
+            response_buffer_size=self.response_buffer_size,
+            response_buffer_delay=self.response_buffer_delay,
+            send_high_water_mark=self.send_high_water_mark,
+            environ_templates=self.environ_templates,
+            thread_pool=self.thread_pool,
+        )(scope, receive, send)
+
+
+class WsgiThreadPool:
+    """
+    A sized thread pool for running WSGI applications in, which turns
+    requests away rather than letting too many of them queue up for a thread.
+
+    Up to max_workers requests run at once. If max_queued is set, once that
+    many more are waiting for a thread, further requests get a
+    503 Service Unavailable response straight away.
+
+    Usage:
+
+    >>> application = WsgiToAsgi(wsgi_application, thread_pool=WsgiThreadPool(16, 64))
+    """
+
+    # Makes sure only one thread resets a pool after a fork (see
+    # asgiref.sync.ThreadSensitivePool.reset_lock).
+    reset_lock = threading.Lock()
+
+    def __init__(self, max_workers, max_queued=None):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be greater than 0")
+        if max_queued is not None and max_queued < 0:
+            raise ValueError("max_queued must not be negative")
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets all threads, for use in a forked process where they no longer
+        exist.
+        """
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.admitted = 0  # synchronized by lock
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="asgiref-wsgi"
         )
 
+    @property
+    def queued(self):
+        """
+        The number of requests waiting for a thread.
+        """
+        return max(self.admitted - self.max_workers, 0)
+
+    def admit(self):
+        """
+        Reserves a place for a request, returning False if there isn't room.
+        """
+        # We make sure the pool is from the same process - if they've forked,
+        # its threads are not going to be valid any more (see #194)
+        if self.pid != os.getpid():
+            with self.reset_lock:
+                # Another thread may have reset it while we waited.
+                if self.pid != os.getpid():
+                    self.reset()
+        with self.lock:
+            if (
+                self.max_queued is not None
+                and self.admitted >= self.max_workers + self.max_queued
+            ):
+                return False
+            self.admitted += 1
+            return True
+
+    def release(self):
+        """
+        Gives up a place reserved by admit().
+        """
+        with self.lock:
+            self.admitted -= 1
+
+
+class WsgiInput:
+    """
+    File-like wsgi.input that reads the request body from the ASGI receive
+    callable as the WSGI application asks for it, rather than up front.
+
+    Only the body of the most recent http.request message is held in memory,
+    and nothing more is received until the application reads it, so a slow
+    application holds back the client rather than buffering its upload.
+    """
+
+    def __init__(self, receive, on_end=None):
+        # receive is a synchronous callable, such as AsyncToSync(receive)
+        self.receive = receive
+        # Called once the whole body has been received
+        self.on_end = on_end
+        self.buffer = b""
+        self.position = 0
+        self.more_body = True
+
+    def _receive_chunk(self):
+        """
+        Receives the next http.request message into the buffer, returning
+        False if the whole body has already been received.
+        """
+        if not self.more_body:
+            return False
+        message = self.receive()
+        if message["type"] == "http.disconnect":
+            self.more_body = False
+            raise OSError("Client disconnected before sending the whole body")
+        if message["type"] != "http.request":
+            raise ValueError("WSGI wrapper received a non-HTTP-request message")
+        self.more_body = message.get("more_body", False)
+        if not self.more_body and self.on_end is not None:
+            self.on_end()
+        chunk = message.get("body", b"")
+        if self.position < len(self.buffer):
+            self.buffer = self.buffer[self.position :] + chunk
+        else:
+            self.buffer = chunk
+        self.position = 0
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            chunks = [self.buffer[self.position :]]
+            self.buffer = b""
+            self.position = 0
+            while self._receive_chunk():
+                chunks.append(self.buffer)
+                self.buffer = b""
+            return b"".join(chunks)
+        while len(self.buffer) - self.position < size and self._receive_chunk():
+            pass
+        data = self.buffer[self.position : self.position + size]
+        self.position += len(data)
+        return data
+
+    def readline(self, size=-1):
+        if size is None:
+            size = -1
+        searched = self.position
+        while True:
+            end = self.buffer.find(b"\n", searched)
+            if end != -1:
+                end += 1
+                break
+            if 0 <= size <= len(self.buffer) - self.position:
+                end = len(self.buffer)
+                break
+            # Don't search the same bytes again once more have arrived.
+            searched = len(self.buffer) - self.position
+            if not self._receive_chunk():
+                end = len(self.buffer)
+                break
+            searched += self.position
+        if size >= 0:
+            end = min(end, self.position + size)
+        data = self.buffer[self.position : end]
+        self.position = end
+        return data
+
+    def readlines(self, hint=-1):
+        lines = []
+        total = 0
+        for line in self:
+            lines.append(line)
+            total += len(line)
+            if 0 < hint <= total:
+                break
+        return lines
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+
+class FileWrapper:
+    """
+    The wsgi.file_wrapper provided to WSGI applications (see PEP 3333).
+
+    Iterating it reads the file in blocks, but WsgiToAsgiInstance recognises
+    it and hands the file to the server instead, if it can.
+    """
+
+    def __init__(self, filelike, block_size=8192):
+        self.filelike = filelike
+        self.block_size = block_size
+        if hasattr(filelike, "close"):
+            self.close = filelike.close
+
+    def __iter__(self):
+        return self.read_blocks(self.block_size)
+
+    def read_blocks(self, block_size):
+        while True:
+            data = self.filelike.read(block_size)
+            if not data:
+                return
+            yield data
+
 
 class WsgiToAsgiInstance:
     """
     Per-socket instance of a wrapped WSGI application
     """
 
-    def __init__(self, wsgi_application, duplicate_header_limit=100):
+    def __init__(
+        self,
+        wsgi_application,
+        duplicate_header_limit=100,
+        stream_request_body=False,
+        response_buffer_size=0,
+        response_buffer_delay=0.01,
+        send_high_water_mark=None,
+        environ_templates=None,
+        thread_pool=None,
+    ):
         self.wsgi_application = wsgi_application
         self.duplicate_header_limit = duplicate_header_limit
+        self.stream_request_body = stream_request_body
+        self.response_buffer_size = response_buffer_size
+        self.response_buffer_delay = response_buffer_delay
+        self.send_high_water_mark = send_high_water_mark
+        self.environ_templates = {} if environ_templates is None else environ_templates
+        self.thread_pool = thread_pool
         self.response_started = False
         self.response_content_length = None
+        # Response body chunks waiting to be sent, if buffering or pipelining
+        # is on. The condition is notified whenever unsent_bytes goes down.
+        self.response_buffer = []
+        self.response_buffered = 0
+        self.response_buffer_lock = threading.Condition()
+        # Bytes given to send_body that have not finished sending yet
+        self.unsent_bytes = 0
+        self.flush_pending = False
+        self.flush_error = None
+        # The call_later handle that flushes a partly full buffer
+        self.flush_timer = None
+        # Set once the client has disconnected
+        self.disconnected = False
+        self.disconnect_listener = None
+        self.finished = False
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             raise ValueError("WSGI wrapper received a non-HTTP scope")
         self.scope = scope
-        with SpooledTemporaryFile(max_size=65536) as body:
-            # Alright, wait for the http.request messages
-            while True:
-                message = await receive()
-                if message["type"] != "http.request":
-                    raise ValueError("WSGI wrapper received a non-HTTP-request message")
-                body.write(message.get("body", b""))
-                if not message.get("more_body"):
-                    break
-            body.seek(0)
-            # Wrap send so it can be called from the subthread
-            self.sync_send = AsyncToSync(send)
-            # Call the WSGI app
-            await self.run_wsgi_app(body)
+        self.loop = asyncio.get_running_loop()
+        self.send = send
+        self.send_lock = asyncio.Lock()
+        self.flush_tasks = set()
+        # Wrap send so it can be called from the subthread
+        self.sync_send = AsyncToSync(send)
+        self.sync_flush = AsyncToSync(self.flush)
+        try:
+            if self.stream_request_body:
+                # Start the WSGI app straight away, and let it read the body
+                # from the subthread as it needs it.
+                body = WsgiInput(
+                    AsyncToSync(receive),
+                    lambda: self.loop.call_soon_threadsafe(
+                        self.start_disconnect_listener, receive
+                    ),
+                )
+                await self.call_wsgi_app(body)
+                return
+            with SpooledTemporaryFile(max_size=65536) as body:
+                # Alright, wait for the http.request messages
+                while True:
+                    message = await receive()
+                    if message["type"] != "http.request":
+                        raise ValueError(
+                            "WSGI wrapper received a non-HTTP-request message"
+                        )
+                    body.write(message.get("body", b""))
+                    if not message.get("more_body"):
+                        break
+                body.seek(0)
+                self.start_disconnect_listener(receive)
+                # Call the WSGI app
+                await self.call_wsgi_app(body)
+        finally:
+            self.finished = True
+            if self.disconnect_listener is not None:
+                self.disconnect_listener.cancel()
+            self.discard_response_buffer()
 
-    def build_environ(self, scope, body):
+    def start_disconnect_listener(self, receive):
         """
-        Builds a scope and request body into a WSGI environ object.
+        Starts watching for the client disconnecting, which it can only be
+        seen to do once the whole request body has been received.
         """
-        script_name = scope.get("root_path", "").encode("utf8").decode("latin1")
-        path_info = scope["path"].encode("utf8").decode("latin1")
-        if path_info.startswith(script_name):
-            path_info = path_info[len(script_name) :]
-        environ = {
-            "REQUEST_METHOD": scope["method"],
-            "SCRIPT_NAME": script_name,
-            "PATH_INFO": path_info,
-            "QUERY_STRING": scope["query_string"].decode("ascii"),
-            "SERVER_PROTOCOL": "HTTP/%s" % scope["http_version"],
+        if not self.finished:
+            self.disconnect_listener = self.loop.create_task(
+                self.wait_for_disconnect(receive)
+            )
+
+    async def wait_for_disconnect(self, receive):
+        # Once the body is over, http.disconnect is the only message a
+        # server should send; give up listening if it sends anything else.
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            with self.response_buffer_lock:
+                self.disconnected = True
+                # Wake the WSGI app's thread if it's waiting to send
+                self.response_buffer_lock.notify_all()
+            self.discard_response_buffer()
+
+    def discard_response_buffer(self):
+        """
+        Stops any buffered response body being sent, once the client has
+        gone or the response is over. Called on the event loop.
+        """
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        for task in list(self.flush_tasks):
+            task.cancel()
+        with self.response_buffer_lock:
+            self.response_buffer.clear()
+            self.response_buffered = 0
+
+    async def call_wsgi_app(self, body):
+        """
+        Runs the WSGI app in a thread - from the thread pool if there is one,
+        or as thread sensitive code otherwise.
+        """
+        if self.thread_pool is None:
+            await sync_to_async(self.run_wsgi_app)(body)
+            return
+        if not self.thread_pool.admit():
+            await self.send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [(b"content-type", b"text/plain")],
+                }
+            )
+            await self.send(
+                {"type": "http.response.body", "body": b"Service Unavailable"}
+            )
+            return
+        try:
+            await sync_to_async(
+                self.run_wsgi_app,
+                thread_sensitive=False,
+                executor=self.thread_pool.executor,
+            )(body)
+        finally:
+            self.thread_pool.release()
+
+    def build_environ_template(self, server, scheme, http_version):
+        """
+        Builds the parts of a WSGI environ that are the same for every
+        request with the same server, scheme and HTTP version.
+        """
+        template = {
+            "SERVER_PROTOCOL": "HTTP/%s" % http_version,
             "wsgi.version": (1, 0),
-            "wsgi.url_scheme": scope.get("scheme", "http"),
-            "wsgi.input": body,
-            "wsgi.errors": sys.stderr,
+            "wsgi.url_scheme": scheme,
             "wsgi.multithread": True,
             "wsgi.multiprocess": True,
             "wsgi.run_once": False,
+            "wsgi.file_wrapper": FileWrapper,
         }
         # Get server name and port - required in WSGI, not in ASGI
-        if "server" in scope:
-            environ["SERVER_NAME"] = scope["server"][0]
-            environ["SERVER_PORT"] = str(scope["server"][1])
+        if server is not None:
+            template["SERVER_NAME"] = server[0]
+            template["SERVER_PORT"] = str(server[1])
         else:
-            environ["SERVER_NAME"] = "localhost"
-            environ["SERVER_PORT"] = "80"
+            template["SERVER_NAME"] = "localhost"
+            template["SERVER_PORT"] = "80"
+        # There's normally only a handful, but bound it in case of a server
+        # that puts something unexpected in the scope.
+        if len(self.environ_templates) < 64:
+            self.environ_templates[(server, scheme, http_version)] = template
+        return template
+
+    def build_environ(self, scope, body):
+        """
+        Builds a scope and request body into a WSGI environ object.
+        """
+        script_name = scope.get("root_path", "").encode("utf8").decode("latin1")
+        path_info = scope["path"].encode("utf8").decode("latin1")
+        if path_info.startswith(script_name):
+            path_info = path_info[len(script_name) :]
+        server = scope.get("server")
+        if server is not None:
+            server = tuple(server)
+        template_key = (server, scope.get("scheme", "http"), scope["http_version"])
+        template = self.environ_templates.get(template_key)
+        if template is None:
+            template = self.build_environ_template(*template_key)
+        environ = template.copy()
+        environ["REQUEST_METHOD"] = scope["method"]
+        environ["SCRIPT_NAME"] = script_name
+        environ["PATH_INFO"] = path_info
+        environ["QUERY_STRING"] = scope["query_string"].decode("ascii")
+        environ["wsgi.input"] = body
+        # Not in the template, in case sys.stderr is replaced (as by pytest)
+        environ["wsgi.errors"] = sys.stderr
 
         if scope.get("client") is not None:
             environ["REMOTE_ADDR"] = scope["client"][0]
 
         # Go through headers and make them into environ entries
-        _headers = defaultdict(list)
-        for name, value in self.scope.get("headers", []):
-            name = name.decode("latin1")
-            if name == "content-length":
-                corrected_name = "CONTENT_LENGTH"
-            elif name == "content-type":
-                corrected_name = "CONTENT_TYPE"
-            else:
-                corrected_name = "HTTP_%s" % name.upper().replace("-", "_")
+        duplicates = None
+        for name, value in scope.get("headers", []):
+            key = _header_environ_keys.get(name)
+            if key is None:
+                key = _header_environ_key(name)
             # HTTPbis say only ASCII chars are allowed in headers, but we latin1 just in case
             value = value.decode("latin1")
+            if key not in environ:
+                environ[key] = value
+                continue
+            # A repeated header - its values are joined with commas below
+            if duplicates is None:
+                duplicates = {}
+            values = duplicates.get(key)
+            if values is None:
+                values = duplicates[key] = [environ[key]]
             if (
                 self.duplicate_header_limit
-                and len(_headers[corrected_name]) >= self.duplicate_header_limit
+                and len(values) >= self.duplicate_header_limit
             ):
                 raise ValueError(
-                    f"Too many duplicate headers: {corrected_name} exceeds limit of"
+                    f"Too many duplicate headers: {key} exceeds limit of"
                     f"{self.duplicate_header_limit}"
                 )
-            _headers[corrected_name].append(value)
-        for name, values in _headers.items():
-            environ[name] = ",".join(values)
+            values.append(value)
+        if duplicates is not None:
+            for key, values in duplicates.items():
+                environ[key] = ",".join(values)
         return environ
 
     def start_response(self, status, response_headers, exc_info=None):
@@ -145,12 +544,14 @@ class WsgiToAsgiInstance:
             "headers": headers,
         }
 
-    @sync_to_async
     def run_wsgi_app(self, body):
         """
         Called in a subthread to run the WSGI app. We encapsulate like
         this so that the start_response callable is called in the same thread.
         """
+        if self.disconnected:
+            # The client went away while this was waiting for a thread
+            return
         # Translate the scope and incoming request body into a WSGI environ
         try:
             environ = self.build_environ(self.scope, body)
@@ -171,8 +572,30 @@ class WsgiToAsgiInstance:
             )
             return
         # Run the WSGI app
+        result = self.wsgi_application(environ, self.start_response)
+        try:
+            self.send_response(result)
+        finally:
+            # PEP 3333 says close() must be called however the response ends -
+            # it's how apps release files, cursors and the like promptly.
+            if hasattr(result, "close"):
+                result.close()
+
+    def send_response(self, result):
+        """
+        Sends the response body from the iterable a WSGI app returned.
+        """
+        response = result
+        if isinstance(result, FileWrapper):
+            if self.send_file(result):
+                return
+            # Each block is a trip to the event loop, so make them big ones.
+            response = result.read_blocks(max(result.block_size, 2**16))
         bytes_sent = 0
-        for output in self.wsgi_application(environ, self.start_response):
+        for output in response:
+            if self.disconnected:
+                # Nobody is listening, so stop making the response
+                return
             # If this is the first response, include the response headers
             if not self.response_started:
                 self.response_started = True
@@ -183,9 +606,7 @@ class WsgiToAsgiInstance:
                 bytes_allowed = self.response_content_length - bytes_sent
                 if len(output) > bytes_allowed:
                     output = output[:bytes_allowed]
-            self.sync_send(
-                {"type": "http.response.body", "body": output, "more_body": True}
-            )
+            self.send_body(output)
             bytes_sent += len(output)
             # The server should stop iterating over the response when enough data has been sent
             if bytes_sent == self.response_content_length:
@@ -194,4 +615,436 @@ class WsgiToAsgiInstance:
         if not self.response_started:
             self.response_started = True
             self.sync_send(self.response_start)
+        if self.response_buffer_size or self.send_high_water_mark is not None:
+            self.sync_flush()
         self.sync_send({"type": "http.response.body"})
+
+    def send_file(self, file_wrapper):
+        """
+        Sends a wsgi.file_wrapper response with the http.response.zerocopysend
+        or http.response.pathsend extension, so the server can send the file
+        without reading it into Python. Returns False if neither can be used.
+        """
+        extensions = self.scope.get("extensions") or {}
+        if not (
+            "http.response.zerocopysend" in extensions
+            or "http.response.pathsend" in extensions
+        ) or not hasattr(self, "response_start"):
+            return False
+        filelike = file_wrapper.filelike
+        try:
+            file_stat = os.fstat(filelike.fileno())
+            position = filelike.tell()
+        except (AttributeError, OSError, ValueError):
+            # Not a real file (io.UnsupportedOperation is both of the latter)
+            return False
+        if not stat.S_ISREG(file_stat.st_mode):
+            return False
+        count = max(file_stat.st_size - position, 0)
+        if self.response_content_length is not None:
+            count = min(count, self.response_content_length)
+        if "http.response.zerocopysend" in extensions:
+            message = {
+                "type": "http.response.zerocopysend",
+                "file": filelike,
+                "count": count,
+                "more_body": False,
+            }
+        else:
+            # Path send always sends the whole file, and only works if the
+            # path still refers to the file that is open.
+            path = getattr(filelike, "name", None)
+            if not isinstance(path, str) or position or count != file_stat.st_size:
+                return False
+            path = os.path.abspath(path)
+            try:
+                if not os.path.samestat(os.stat(path), file_stat):
+                    return False
+            except OSError:
+                return False
+            message = {"type": "http.response.pathsend", "path": path}
+        self.response_started = True
+        self.sync_send(self.response_start)
+        self.sync_send(message)
+        return True
+
+    def send_body(self, output):
+        """
+        Sends a chunk of response body from the WSGI app's thread.
+
+        If response buffering is on, the chunk is held back and sent along
+        with later ones once response_buffer_size bytes have built up, or
+        after response_buffer_delay seconds, whichever comes first.
+
+        If send_high_water_mark is set, this returns without waiting for the
+        chunk to be sent, unless more than that many bytes are still waiting
+        to be sent. Errors from sending are raised by the next call.
+        """
+        pipelined = self.send_high_water_mark is not None
+        if not self.response_buffer_size and not pipelined:
+            self.sync_send(
+                {"type": "http.response.body", "body": output, "more_body": True}
+            )
+            return
+        if self.flush_error is not None:
+            raise self.flush_error
+        with self.response_buffer_lock:
+            self.response_buffer.append(output)
+            self.response_buffered += len(output)
+            self.unsent_bytes += len(output)
+            first = len(self.response_buffer) == 1
+            full = self.response_buffered >= self.response_buffer_size
+            # Only one flush needs to be waiting to run, as it sends
+            # everything that is in the buffer when it does.
+            start_flush = full and pipelined and not self.flush_pending
+            if start_flush:
+                self.flush_pending = True
+        if start_flush:
+            self.loop.call_soon_threadsafe(self.start_flush)
+        elif full and not pipelined:
+            self.sync_flush()
+        elif first and not full:
+            # Make sure this chunk goes out even if the app stops producing
+            # output for a while, as streaming responses do.
+            self.loop.call_soon_threadsafe(self.start_flush_timer)
+        if pipelined:
+            with self.response_buffer_lock:
+                self.response_buffer_lock.wait_for(
+                    lambda: self.unsent_bytes <= self.send_high_water_mark
+                    or self.flush_error is not None
+                    or self.disconnected
+                )
+            if self.flush_error is not None:
+                raise self.flush_error
+
+    async def flush(self):
+        """
+        Sends everything in the response buffer as one message.
+        """
+        # Sends are made in the order they take the lock, and each takes
+        # everything buffered when it does, so chunks stay in order.
+        async with self.send_lock:
+            if self.flush_error is not None:
+                raise self.flush_error
+            with self.response_buffer_lock:
+                body = b"".join(self.response_buffer)
+                self.response_buffer.clear()
+                self.response_buffered = 0
+                self.flush_pending = False
+            if body:
+                try:
+                    await self.send(
+                        {"type": "http.response.body", "body": body, "more_body": True}
+                    )
+                finally:
+                    with self.response_buffer_lock:
+                        self.unsent_bytes -= len(body)
+                        self.response_buffer_lock.notify_all()
+
+    def start_flush_timer(self):
+        """
+        Flushes the response buffer after response_buffer_delay, unless it
+        has been flushed by then.
+        """
+        if self.flush_timer is None and not (self.finished or self.disconnected):
+            self.flush_timer = self.loop.call_later(
+                self.response_buffer_delay, self.start_flush
+            )
+
+    def start_flush(self):
+        """
+        Flushes the response buffer in the background.
+        """
+        # If the buffer filled up before the timer went off, the timer would
+        # otherwise go on to flush the next chunks well before their delay.
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        if self.finished or self.disconnected:
+            return
+        task = self.loop.create_task(self.flush())
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.start_flush_done)
+
+    def start_flush_done(self, task):
+        self.flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # Raise it in the WSGI app's thread the next time it sends.
+            with self.response_buffer_lock:
+                self.flush_error = task.exception()
+                self.response_buffer_lock.notify_all()
+
+
+class AsgiToWsgi:
+    """
+    Wraps an ASGI application to make it into a WSGI application.
+
+    Requests are run on an event loop in a background thread that is shared
+    by every WSGI worker thread in the process, rather than on a new event
+    loop for each request. Request and response bodies are streamed.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    def __call__(self, environ, start_response):
+        """
+        WSGI application entry point.
+        We return a new AsgiToWsgiInstance here with the ASGI app, which runs
+        the request on the shared event loop.
+        """
+        return AsgiToWsgiInstance(self.application)(environ, start_response)
+
+
+class AsgiToWsgiInstance:
+    """
+    Per-request instance of a wrapped ASGI application.
+
+    The application's receive and send calls are passed to the WSGI server's
+    thread through a queue, and answered from there, as wsgi.input and the
+    response iterable both have to be used from that thread.
+    """
+
+    # How much of the request body to read for each http.request message
+    chunk_size = 2**16
+
+    def __init__(self, application):
+        self.application = application
+        self.events = queue.Queue()
+        # receive and send futures on the event loop that are still waiting
+        self.waiting_receives = set()
+        self.waiting_sends = set()
+        self.disconnected = False
+        self.more_response = True
+
+    def __call__(self, environ, start_response):
+        self.environ = environ
+        self.input = environ["wsgi.input"]
+        if environ.get("CONTENT_LENGTH"):
+            self.body_remaining = int(environ["CONTENT_LENGTH"])
+        elif environ.get("wsgi.input_terminated"):
+            # Read until wsgi.input runs out
+            self.body_remaining = None
+        else:
+            self.body_remaining = 0
+        self.more_body = True
+        persistent_loop = AsyncToSync.get_process_loop()
+        self.loop = persistent_loop.loop
+        persistent_loop.submit(self.run_application(self.build_scope(environ)))
+        try:
+            message = self.next_message()
+            if message is None:
+                raise RuntimeError("ASGI application returned without a response")
+            if message["type"] != "http.response.start":
+                raise ValueError(
+                    "Expected http.response.start, got %s" % message["type"]
+                )
+            status = message["status"]
+            try:
+                reason = HTTPStatus(status).phrase
+            except ValueError:
+                reason = "Unknown"
+            start_response(
+                "%d %s" % (status, reason),
+                [
+                    (name.decode("latin1"), value.decode("latin1"))
+                    for name, value in message.get("headers", [])
+                ],
+            )
+        except BaseException:
+            self.close()
+            raise
+        return AsgiToWsgiResponse(self)
+
+    def build_scope(self, environ):
+        """
+        Builds an ASGI scope from a WSGI environ.
+        """
+        script_name = environ.get("SCRIPT_NAME", "")
+        path_info = environ.get("PATH_INFO", "")
+        headers = []
+        for key, value in environ.items():
+            if key.startswith("HTTP_"):
+                name = key[5:].lower().replace("_", "-")
+                headers.append((name.encode("latin1"), value.encode("latin1")))
+        for key, name in (
+            ("CONTENT_TYPE", b"content-type"),
+            ("CONTENT_LENGTH", b"content-length"),
+        ):
+            if environ.get(key):
+                headers.append((name, environ[key].encode("latin1")))
+        protocol = environ.get("SERVER_PROTOCOL", "HTTP/1.1")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.4"},
+            "http_version": protocol.partition("/")[2] or "1.1",
+            "method": environ["REQUEST_METHOD"].upper(),
+            "scheme": environ.get("wsgi.url_scheme", "http"),
+            # WSGI paths are bytes decoded as latin-1, ASGI's are UTF-8
+            "path": (script_name + path_info)
+            .encode("latin1")
+            .decode("utf8", errors="replace"),
+            "root_path": script_name.encode("latin1").decode("utf8", errors="replace"),
+            "query_string": environ.get("QUERY_STRING", "").encode("latin1"),
+            "headers": headers,
+            "server": (environ["SERVER_NAME"], int(environ["SERVER_PORT"])),
+        }
+        # PATH_INFO has been percent-decoded, so the raw path can only come
+        # from servers that pass on the request URI as it was sent.
+        raw_uri = environ.get("RAW_URI") or environ.get("REQUEST_URI")
+        if raw_uri:
+            scope["raw_path"] = raw_uri.partition("?")[0].encode("latin1")
+        if environ.get("REMOTE_ADDR"):
+            scope["client"] = (
+                environ["REMOTE_ADDR"],
+                int(environ.get("REMOTE_PORT") or 0),
+            )
+        return scope
+
+    async def run_application(self, scope):
+        try:
+            await self.application(scope, self.receive, self.send)
+        except BaseException as e:
+            self.events.put(("done", e))
+            raise
+        else:
+            self.events.put(("done", None))
+
+    async def receive(self):
+        if self.disconnected:
+            return {"type": "http.disconnect"}
+        future = self.loop.create_future()
+        self.waiting_receives.add(future)
+        self.events.put(("receive", future))
+        try:
+            return await future
+        finally:
+            self.waiting_receives.discard(future)
+
+    async def send(self, message):
+        if self.disconnected:
+            raise OSError("Client disconnected")
+        # Only resolved once the WSGI thread has taken the message, so that
+        # the application can't get far ahead of a slow client.
+        future = self.loop.create_future()
+        self.waiting_sends.add(future)
+        self.events.put(("send", message, future))
+        try:
+            await future
+        finally:
+            self.waiting_sends.discard(future)
+
+    def resolve(self, future, result):
+        # Called on the event loop; the future may have been cancelled, or
+        # already resolved by disconnect().
+        if not future.done():
+            future.set_result(result)
+
+    def disconnect(self):
+        """
+        Tells the application the client has gone, once the response is over
+        or the WSGI server has given up on it. Called on the event loop.
+        """
+        self.disconnected = True
+        for future in self.waiting_receives:
+            self.resolve(future, {"type": "http.disconnect"})
+        for future in self.waiting_sends:
+            if not future.done():
+                future.set_exception(OSError("Client disconnected"))
+
+    def next_message(self):
+        """
+        Handles the application's receive calls until it sends a message,
+        and returns that, or None if the application has finished.
+        """
+        while True:
+            event = self.events.get()
+            if event[0] == "receive":
+                self.handle_receive(event[1])
+            elif event[0] == "send":
+                self.loop.call_soon_threadsafe(self.resolve, event[2], None)
+                return event[1]
+            else:
+                if event[1] is not None:
+                    raise event[1]
+                return None
+
+    def handle_receive(self, future):
+        if not self.more_body:
+            # The whole body has been received, so the application will hear
+            # nothing more until the client disconnects.
+            return
+        size = self.chunk_size
+        if self.body_remaining is not None:
+            size = min(size, self.body_remaining)
+        body = self.input.read(size) if size else b""
+        if self.body_remaining is not None:
+            self.body_remaining -= len(body)
+            self.more_body = bool(body) and self.body_remaining > 0
+        else:
+            self.more_body = bool(body)
+        self.loop.call_soon_threadsafe(
+            self.resolve,
+            future,
+            {"type": "http.request", "body": body, "more_body": self.more_body},
+        )
+
+    def response_body(self):
+        """
+        Returns the next chunk of response body, or None once it is over.
+        """
+        while True:
+            message = self.next_message()
+            if message is None:
+                return None
+            if message["type"] != "http.response.body":
+                raise ValueError(
+                    "Expected http.response.body, got %s" % message["type"]
+                )
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if not more_body:
+                self.more_response = False
+            if body:
+                return body
+            if not more_body:
+                return None
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.disconnect)
+
+
+class AsgiToWsgiResponse:
+    """
+    The response iterable AsgiToWsgi returns to the WSGI server.
+
+    The application is told the client has gone when the response finishes,
+    fails, or is closed by the server - even if that is before the server
+    has started iterating over it.
+    """
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed or not self.instance.more_response:
+            self.close()
+            raise StopIteration
+        try:
+            body = self.instance.response_body()
+        except BaseException:
+            self.close()
+            raise
+        if body is None:
+            self.close()
+            raise StopIteration
+        return body
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.instance.close()
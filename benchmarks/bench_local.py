@@ -0,0 +1,117 @@
+"""
+Benchmarks for attribute access on asgiref.local.Local.
+"""
+
+import asyncio
+import threading
+from collections.abc import Callable
+
+from harness import Timings, benchmark, time_calls
+
+from asgiref.local import Local
+
+
+def local_get(local: Local, iterations: int) -> Timings:
+    local.value = 1
+    return time_calls(lambda: local.value, iterations)
+
+
+def local_set(local: Local, iterations: int) -> Timings:
+    def set_value() -> None:
+        local.value = 1
+
+    return time_calls(set_value, iterations)
+
+
+async def in_async(
+    func: Callable[[Local, int], Timings], local: Local, iterations: int
+) -> Timings:
+    # Runs a benchmark inside a running event loop, where Local behaves like
+    # a contextvar rather than a thread local.
+    return func(local, iterations)
+
+
+@benchmark("Local.get[sync]", 100000)
+def local_get_sync(iterations: int) -> Timings:
+    return local_get(Local(), iterations)
+
+
+@benchmark("Local.set[sync]", 100000)
+def local_set_sync(iterations: int) -> Timings:
+    return local_set(Local(), iterations)
+
+
+@benchmark("Local.get[async]", 100000)
+def local_get_async(iterations: int) -> Timings:
+    return asyncio.run(in_async(local_get, Local(), iterations))
+
+
+@benchmark("Local.set[async]", 100000)
+def local_set_async(iterations: int) -> Timings:
+    return asyncio.run(in_async(local_set, Local(), iterations))
+
+
+def local_set_many_keys_async(keys: int, iterations: int) -> Timings:
+    local = Local()
+
+    async def main() -> Timings:
+        for i in range(keys):
+            setattr(local, f"key{i}", i)
+        return local_set(local, iterations)
+
+    return asyncio.run(main())
+
+
+@benchmark("Local.set[async,20 keys]", 100000)
+def local_set_20_keys_async(iterations: int) -> Timings:
+    return local_set_many_keys_async(20, iterations)
+
+
+@benchmark("Local.set[async,1000 keys]", 100000)
+def local_set_1000_keys_async(iterations: int) -> Timings:
+    return local_set_many_keys_async(1000, iterations)
+
+
+@benchmark("Local.get[thread_critical,sync]", 100000)
+def local_get_thread_critical_sync(iterations: int) -> Timings:
+    return local_get(Local(thread_critical=True), iterations)
+
+
+@benchmark("Local.set[thread_critical,sync]", 100000)
+def local_set_thread_critical_sync(iterations: int) -> Timings:
+    return local_set(Local(thread_critical=True), iterations)
+
+
+@benchmark("Local.get[thread_critical,async]", 100000)
+def local_get_thread_critical_async(iterations: int) -> Timings:
+    return asyncio.run(in_async(local_get, Local(thread_critical=True), iterations))
+
+
+@benchmark("Local.set[thread_critical,async]", 100000)
+def local_set_thread_critical_async(iterations: int) -> Timings:
+    return asyncio.run(in_async(local_set, Local(thread_critical=True), iterations))
+
+
+@benchmark("Local.get+set[sync,8 threads]", 100000)
+def local_get_set_threads(iterations: int) -> Timings:
+    # The same Local used from several threads at once, as a module-level
+    # Local is in a threaded WSGI server.
+    local = Local()
+    results: list[Timings] = []
+
+    def get_set() -> None:
+        local.value = local.value + 1
+
+    def worker() -> None:
+        local.value = 0
+        results.append(time_calls(get_set, iterations // 8))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return Timings(
+        [latency for result in results for latency in result.latencies],
+        max(result.elapsed for result in results),
+    )
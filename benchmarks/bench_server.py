@@ -0,0 +1,61 @@
+"""
+Benchmarks for application instance management in asgiref.server.StatelessServer.
+"""
+
+import asyncio
+import itertools
+from typing import Any
+
+from harness import Timings, benchmark, time_calls
+
+from asgiref.server import StatelessServer
+
+
+async def application(scope: Any, receive: Any, send: Any) -> None:
+    while True:
+        await receive()
+
+
+class BenchmarkServer(StatelessServer):
+    async def handle(self) -> None:
+        pass
+
+    async def application_send(self, scope: Any, message: Any) -> None:
+        pass
+
+
+def server_instances(instances: int, iterations: int, new: bool) -> Timings:
+    """
+    Times get_or_create_application_instance on a server that already has
+    as many instances as it allows, for new scopes (so each call evicts the
+    least recently used instance) or for existing ones.
+    """
+
+    async def main() -> Timings:
+        server = BenchmarkServer(application, max_applications=instances)
+        for i in range(instances):
+            server.get_or_create_application_instance(f"scope-{i}", {})
+        scope_ids = (
+            itertools.count(instances) if new else itertools.cycle(range(instances))
+        )
+
+        def get_or_create() -> None:
+            server.get_or_create_application_instance(f"scope-{next(scope_ids)}", {})
+
+        timings = time_calls(get_or_create, iterations)
+        for details in server.application_instances.values():
+            details["future"].cancel()
+        await asyncio.sleep(0)
+        return timings
+
+    return asyncio.run(main())
+
+
+@benchmark("StatelessServer.get_or_create[100k instances,new]", 1000)
+def server_new_instances(iterations: int) -> Timings:
+    return server_instances(100000, iterations, new=True)
+
+
+@benchmark("StatelessServer.get_or_create[100k instances,existing]", 100000)
+def server_existing_instances(iterations: int) -> Timings:
+    return server_instances(100000, iterations, new=False)
@@ -0,0 +1,142 @@
+"""
+Benchmarks for the sync/async bridges in asgiref.sync.
+"""
+
+import asyncio
+import contextvars
+
+from harness import Timings, benchmark, time_async_calls, time_calls
+
+from asgiref.local import Local
+from asgiref.sync import (
+    AsyncToSync,
+    ThreadSensitiveContext,
+    ThreadSensitivePool,
+    async_to_sync,
+    sync_to_async,
+    sync_to_async_batch,
+)
+
+
+def noop() -> None:
+    pass
+
+
+async def async_noop() -> None:
+    pass
+
+
+@benchmark("sync_to_async[thread_sensitive]", 5000)
+def sync_to_async_thread_sensitive(iterations: int) -> Timings:
+    return asyncio.run(time_async_calls(sync_to_async(noop), iterations))
+
+
+@benchmark("sync_to_async[thread_sensitive=False]", 5000)
+def sync_to_async_not_thread_sensitive(iterations: int) -> Timings:
+    return asyncio.run(
+        time_async_calls(sync_to_async(noop, thread_sensitive=False), iterations)
+    )
+
+
+@benchmark("sync_to_async[thread_sensitive=False,concurrency=16]", 5000)
+def sync_to_async_not_thread_sensitive_concurrent(iterations: int) -> Timings:
+    return asyncio.run(
+        time_async_calls(
+            sync_to_async(noop, thread_sensitive=False), iterations, concurrency=16
+        )
+    )
+
+
+@benchmark("sync_to_async[50 contextvars,10 locals]", 5000)
+def sync_to_async_many_contextvars(iterations: int) -> Timings:
+    cvars: "list[contextvars.ContextVar[int]]" = [
+        contextvars.ContextVar(f"var{i}") for i in range(50)
+    ]
+    locals_ = [Local() for _ in range(10)]
+
+    async def main() -> Timings:
+        for i, cvar in enumerate(cvars):
+            cvar.set(i)
+        for local in locals_:
+            local.value = 1
+        return await time_async_calls(
+            sync_to_async(noop, thread_sensitive=False), iterations
+        )
+
+    return asyncio.run(main())
+
+
+@benchmark("sync_to_async_batch[10 calls]", 1000)
+def sync_to_async_batch_ten(iterations: int) -> Timings:
+    async def batch() -> None:
+        await sync_to_async_batch([noop] * 10)
+
+    return asyncio.run(time_async_calls(batch, iterations))
+
+
+@benchmark("ThreadSensitiveContext[concurrency=16]", 2000)
+def thread_sensitive_context(iterations: int) -> Timings:
+    sync_noop = sync_to_async(noop)
+
+    async def request() -> None:
+        async with ThreadSensitiveContext():
+            await sync_noop()
+            await sync_noop()
+
+    return asyncio.run(time_async_calls(request, iterations, concurrency=16))
+
+
+@benchmark("ThreadSensitiveContext[pool=4,concurrency=16]", 2000)
+def thread_sensitive_context_pool(iterations: int) -> Timings:
+    sync_noop = sync_to_async(noop)
+    pool = ThreadSensitivePool(max_workers=4)
+
+    async def request() -> None:
+        async with ThreadSensitiveContext(pool=pool):
+            await sync_noop()
+            await sync_noop()
+
+    return asyncio.run(time_async_calls(request, iterations, concurrency=16))
+
+
+@benchmark("async_to_sync[new loop]", 1000)
+def async_to_sync_new_loop(iterations: int) -> Timings:
+    return time_calls(async_to_sync(async_noop), iterations)
+
+
+@benchmark("async_to_sync[persistent thread loop]", 5000)
+def async_to_sync_persistent_loop(iterations: int) -> Timings:
+    old_persistent_loop = AsyncToSync.persistent_loop
+    AsyncToSync.persistent_loop = "thread"
+    try:
+        return time_calls(async_to_sync(async_noop), iterations)
+    finally:
+        AsyncToSync.persistent_loop = old_persistent_loop
+
+
+@benchmark("async_to_sync[from sync_to_async]", 2000)
+def async_to_sync_in_sync_to_async(iterations: int) -> Timings:
+    # The outer loop is found, so this measures scheduling onto it and
+    # idling in a CurrentThreadExecutor rather than loop startup.
+    @sync_to_async
+    def run() -> Timings:
+        return time_calls(async_to_sync(async_noop), iterations)
+
+    return asyncio.run(run())
+
+
+@benchmark("nested[sync_to_async>async_to_sync>sync_to_async]", 2000)
+def nested_stack(iterations: int) -> Timings:
+    async def inner() -> None:
+        await sync_to_async(noop)()
+
+    middle = sync_to_async(async_to_sync(inner))
+    return asyncio.run(time_async_calls(middle, iterations))
+
+
+@benchmark("nested[async_to_sync>sync_to_async>async_to_sync]", 500)
+def nested_stack_from_sync(iterations: int) -> Timings:
+    async def outer() -> None:
+        await sync_to_async(async_to_sync(async_noop))()
+
+    return time_calls(async_to_sync(outer), iterations)
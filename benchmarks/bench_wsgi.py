@@ -0,0 +1,215 @@
+"""
+Benchmarks for whole requests through the asgiref.wsgi adapters.
+"""
+
+import asyncio
+import io
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from harness import Timings, benchmark, time_async_calls, time_calls
+
+from asgiref.wsgi import AsgiToWsgi, WsgiThreadPool, WsgiToAsgi, WsgiToAsgiInstance
+
+HEADERS = [
+    (b"host", b"localhost"),
+    (b"user-agent", b"benchmark"),
+    (b"accept", b"*/*"),
+    (b"accept-encoding", b"gzip, deflate"),
+    (b"content-type", b"application/octet-stream"),
+    (b"cookie", b"sessionid=abc123"),
+]
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "POST",
+    "scheme": "http",
+    "path": "/benchmark/",
+    "root_path": "",
+    "query_string": b"page=1",
+    "headers": HEADERS,
+    "server": ("127.0.0.1", 8000),
+    "client": ("127.0.0.1", 50000),
+}
+
+CHUNK_SIZE = 64 * 1024
+
+
+def wsgi_application(
+    environ: dict[str, Any], start_response: Callable[..., Any]
+) -> Iterable[bytes]:
+    """
+    Echoes the request body back, in the same size chunks it was read in.
+    """
+    length = int(environ.get("CONTENT_LENGTH") or 0)
+    start_response(
+        "200 OK",
+        [("Content-Type", "application/octet-stream"), ("Content-Length", str(length))],
+    )
+    body = environ["wsgi.input"]
+    chunk = body.read(CHUNK_SIZE)
+    if not chunk:
+        return [b""]
+    chunks = []
+    while chunk:
+        chunks.append(chunk)
+        chunk = body.read(CHUNK_SIZE)
+    return chunks
+
+
+def chunked_wsgi_application(
+    environ: dict[str, Any], start_response: Callable[..., Any]
+) -> Iterable[bytes]:
+    """
+    Yields a response in many small chunks, like a template or CSV export.
+    """
+    start_response("200 OK", [("Content-Type", "text/csv")])
+    for row in range(500):
+        yield b"%d,some,csv,columns\n" % row
+
+
+def wsgi_requests(
+    body_size: int,
+    iterations: int,
+    concurrency: int,
+    stream: bool = False,
+    application: "WsgiToAsgi | None" = None,
+) -> Timings:
+    if application is None:
+        application = WsgiToAsgi(wsgi_application, stream_request_body=stream)
+    body = b"x" * body_size
+    scope = dict(SCOPE)
+    scope["headers"] = HEADERS + [(b"content-length", str(body_size).encode("ascii"))]
+
+    async def request() -> None:
+        # Deliver the body in 64KiB http.request messages, as a server would.
+        messages = [
+            {
+                "type": "http.request",
+                "body": body[offset : offset + CHUNK_SIZE],
+                "more_body": offset + CHUNK_SIZE < body_size,
+            }
+            for offset in range(0, max(body_size, 1), CHUNK_SIZE)
+        ]
+        messages.reverse()
+
+        async def receive() -> dict[str, Any]:
+            if messages:
+                return messages.pop()
+            # Only reached by applications that wait for a disconnect.
+            await asyncio.Event().wait()
+            raise AssertionError("unreachable")
+
+        async def send(message: dict[str, Any]) -> None:
+            pass
+
+        assert application is not None
+        await application(scope, receive, send)
+
+    return asyncio.run(time_async_calls(request, iterations, concurrency))
+
+
+def register(
+    body_size: int, size_name: str, concurrency: int, stream: bool = False
+) -> None:
+    @benchmark(
+        f"WsgiToAsgi[body={size_name},concurrency={concurrency}"
+        + (",stream]" if stream else "]"),
+        200 if body_size >= 2**20 else 2000,
+    )
+    def wsgi_benchmark(iterations: int) -> Timings:
+        return wsgi_requests(body_size, iterations, concurrency, stream)
+
+
+for body_size, size_name in (
+    (0, "0B"),
+    (1024, "1KiB"),
+    (2**16, "64KiB"),
+    (2**20, "1MiB"),
+):
+    for concurrency in (1, 16):
+        register(body_size, size_name, concurrency)
+    register(body_size, size_name, 1, stream=True)
+
+
+@benchmark("WsgiToAsgi[body=1KiB,concurrency=16,thread_pool=16]", 2000)
+def wsgi_thread_pool(iterations: int) -> Timings:
+    application = WsgiToAsgi(wsgi_application, thread_pool=WsgiThreadPool(16))
+    return wsgi_requests(1024, iterations, 16, application=application)
+
+
+@benchmark("WsgiToAsgi[500 chunks]", 200)
+def wsgi_chunks(iterations: int) -> Timings:
+    return wsgi_requests(
+        0, iterations, 1, application=WsgiToAsgi(chunked_wsgi_application)
+    )
+
+
+@benchmark("WsgiToAsgi[500 chunks,response_buffer_size=64KiB]", 200)
+def wsgi_chunks_buffered(iterations: int) -> Timings:
+    application = WsgiToAsgi(chunked_wsgi_application, response_buffer_size=2**16)
+    return wsgi_requests(0, iterations, 1, application=application)
+
+
+@benchmark("WsgiToAsgi[500 chunks,send_high_water_mark=64KiB]", 200)
+def wsgi_chunks_pipelined(iterations: int) -> Timings:
+    application = WsgiToAsgi(chunked_wsgi_application, send_high_water_mark=2**16)
+    return wsgi_requests(0, iterations, 1, application=application)
+
+
+@benchmark("WsgiToAsgiInstance.build_environ", 100000)
+def build_environ(iterations: int) -> Timings:
+    instance = WsgiToAsgiInstance(wsgi_application)
+    instance.scope = SCOPE
+    return time_calls(lambda: instance.build_environ(SCOPE, None), iterations)
+
+
+async def asgi_application(
+    scope: dict[str, Any],
+    receive: Callable[[], Awaitable[dict[str, Any]]],
+    send: Callable[[dict[str, Any]], Awaitable[None]],
+) -> None:
+    """
+    Echoes the request body back, in the same size chunks it was received in.
+    """
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    more_body = True
+    while more_body:
+        message = await receive()
+        more_body = message.get("more_body", False)
+        await send(
+            {
+                "type": "http.response.body",
+                "body": message.get("body", b""),
+                "more_body": more_body,
+            }
+        )
+
+
+@benchmark("AsgiToWsgi[body=1KiB]", 2000)
+def asgi_to_wsgi(iterations: int) -> Timings:
+    application = AsgiToWsgi(asgi_application)
+    body = b"x" * 1024
+
+    def start_response(status: str, headers: list[tuple[str, str]]) -> None:
+        pass
+
+    def request() -> None:
+        environ = {
+            "REQUEST_METHOD": "POST",
+            "PATH_INFO": "/benchmark/",
+            "QUERY_STRING": "page=1",
+            "SERVER_NAME": "127.0.0.1",
+            "SERVER_PORT": "8000",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "CONTENT_LENGTH": str(len(body)),
+            "HTTP_HOST": "localhost",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(body),
+        }
+        for _ in application(environ, start_response):
+            pass
+
+    return time_calls(request, iterations)
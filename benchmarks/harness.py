@@ -0,0 +1,102 @@
+"""
+Timing helpers shared by the benchmark modules.
+
+Each benchmark is a function registered with @benchmark, taking the number
+of iterations to run and returning a Timings object. Timings hold one latency
+per operation plus the wall-clock time for all of them, so results can report
+both latency percentiles and throughput.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+BENCHMARKS: "dict[str, tuple[Callable[[int], Timings], int]]" = {}
+
+
+class Timings:
+    """
+    Per-operation latencies (in nanoseconds) and the total elapsed time (in
+    seconds) of a benchmark run.
+    """
+
+    def __init__(self, latencies: list[int], elapsed: float) -> None:
+        self.latencies = sorted(latencies)
+        self.elapsed = elapsed
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns the given latency percentile, in microseconds.
+        """
+        index = round(percent / 100 * (len(self.latencies) - 1))
+        return self.latencies[index] / 1000
+
+    @property
+    def throughput(self) -> float:
+        """
+        Operations per second over the whole run.
+        """
+        return len(self.latencies) / self.elapsed
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "iterations": len(self.latencies),
+            "ops_per_sec": self.throughput,
+            "p50_us": self.percentile(50),
+            "p90_us": self.percentile(90),
+            "p99_us": self.percentile(99),
+            "max_us": self.percentile(100),
+        }
+
+
+def benchmark(
+    name: str, iterations: int
+) -> Callable[[Callable[[int], Timings]], Callable[[int], Timings]]:
+    """
+    Registers a benchmark under the given name, with its default number of
+    iterations.
+    """
+
+    def decorator(func: Callable[[int], Timings]) -> Callable[[int], Timings]:
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark name {name!r}")
+        BENCHMARKS[name] = (func, iterations)
+        return func
+
+    return decorator
+
+
+def time_calls(func: Callable[[], object], iterations: int) -> Timings:
+    """
+    Times calling a synchronous function the given number of times.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter_ns()
+        func()
+        latencies.append(time.perf_counter_ns() - call_start)
+    return Timings(latencies, time.perf_counter() - start)
+
+
+async def time_async_calls(
+    func: Callable[[], Awaitable[object]], iterations: int, concurrency: int = 1
+) -> Timings:
+    """
+    Times awaiting an async function the given number of times, spread over
+    `concurrency` concurrent tasks.
+    """
+    latencies: list[int] = []
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            call_start = time.perf_counter_ns()
+            await func()
+            latencies.append(time.perf_counter_ns() - call_start)
+
+    counts = [iterations // concurrency] * concurrency
+    counts[0] += iterations % concurrency
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(count) for count in counts))
+    return Timings(latencies, time.perf_counter() - start)
@@ -0,0 +1,109 @@
+"""
+Runs the asgiref microbenchmarks.
+
+Usage:
+
+    python benchmarks/run.py                   # run everything
+    python benchmarks/run.py -k Local          # only names containing "Local"
+    python benchmarks/run.py --json out.json   # also save results as JSON
+    python benchmarks/run.py --compare base.json
+
+Results from --json can be passed to a later run with --compare to print the
+throughput change of each benchmark relative to them.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+from typing import Any
+
+import bench_local  # noqa: F401
+import bench_server  # noqa: F401
+import bench_sync  # noqa: F401
+import bench_wsgi  # noqa: F401
+from harness import BENCHMARKS, Timings
+
+import asgiref
+
+
+def run_benchmark(name: str, iterations: int) -> Timings:
+    func, _ = BENCHMARKS[name]
+    # Warm up caches, thread pools and the like before measuring.
+    func(max(iterations // 10, 1))
+    gc.collect()
+    return func(iterations)
+
+
+def main(argv: "list[str] | None" = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the asgiref microbenchmarks.")
+    parser.add_argument(
+        "-k",
+        dest="filter",
+        default="",
+        help="Only run benchmarks whose name contains this string",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply every benchmark's number of iterations by this",
+    )
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a previous JSON file")
+    parser.add_argument(
+        "--list", action="store_true", help="List benchmark names and exit"
+    )
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    baseline: dict[str, Any] = {}
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)["results"]
+
+    header = (
+        f"{'benchmark':<56} {'ops/s':>10} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9}"
+    )
+    if baseline:
+        header += f" {'change':>8}"
+    print(header)
+    results = {}
+    for name in names:
+        iterations = max(int(BENCHMARKS[name][1] * args.scale), 1)
+        result = run_benchmark(name, iterations).as_dict()
+        results[name] = result
+        line = (
+            f"{name:<56} {result['ops_per_sec']:>10.0f} {result['p50_us']:>9.1f}"
+            f" {result['p90_us']:>9.1f} {result['p99_us']:>9.1f}"
+        )
+        if name in baseline:
+            change = result["ops_per_sec"] / baseline[name]["ops_per_sec"] - 1
+            line += f" {change:>+8.1%}"
+        print(line, flush=True)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(
+                {
+                    "asgiref": asgiref.__version__,
+                    "python": sys.version,
+                    "implementation": platform.python_implementation(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "results": results,
+                },
+                fh,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
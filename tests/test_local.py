@@ -6,7 +6,7 @@ from threading import Thread
 
 import pytest
 
-from asgiref.local import Local
+from asgiref.local import Local, _clear_thread_critical_locals
 from asgiref.sync import async_to_sync, sync_to_async
 
 
@@ -431,3 +431,53 @@ async def test_deletion() -> None:
 
     await asyncio.create_task(_test())
     assert test_local.value == 123
+
+
+@pytest.mark.asyncio
+async def test_many_keys() -> None:
+    """Check a Local with many keys across tasks, including deletions."""
+    test_local = Local()
+    for i in range(1000):
+        setattr(test_local, f"key{i}", i)
+
+    async def _test() -> None:
+        # Writes in a task are made to a copy of the caller's data
+        for i in range(0, 1000, 2):
+            delattr(test_local, f"key{i}")
+        test_local.key1 = "changed"
+        assert not hasattr(test_local, "key0")
+        with pytest.raises(AttributeError):
+            del test_local.key0
+        assert test_local.key1 == "changed"
+        assert test_local.key999 == 999
+        test_local.key0 = "restored"
+        assert test_local.key0 == "restored"
+
+    await asyncio.create_task(_test())
+    assert all(getattr(test_local, f"key{i}") == i for i in range(1000))
+    with pytest.raises(AttributeError):
+        del test_local.missing
+
+
+def test_clear_thread_critical_locals_while_creating():
+    """
+    Thread critical Locals can be created in one thread while another is
+    having them cleared for reuse.
+    """
+    done = threading.Event()
+    kept = []
+
+    def create():
+        for _ in range(20000):
+            kept.append(Local(thread_critical=True))
+            if len(kept) > 100:
+                kept.clear()
+        done.set()
+
+    thread = threading.Thread(target=create)
+    thread.start()
+    try:
+        while not done.is_set():
+            _clear_thread_critical_locals()
+    finally:
+        thread.join()
@@ -1,11 +1,21 @@
 import asyncio
+import multiprocessing
+import os
 import socket as sock
+import sys
 import threading
 
 import pytest
 import pytest_asyncio
 
-from asgiref.server import StatelessServer
+from asgiref.server import (
+    ApplicationQueue,
+    PipeTransport,
+    ShardedServer,
+    StatelessServer,
+    UnixSocketTransport,
+)
+from asgiref.sync import AsyncToSync
 
 
 async def sock_recvfrom(sock, n):
@@ -17,10 +27,20 @@ async def sock_recvfrom(sock, n):
 
 
 class Server(StatelessServer):
-    def __init__(self, application, max_applications=1000):
+    def __init__(
+        self,
+        application,
+        max_applications=1000,
+        idle_timeout=None,
+        max_queue_size=0,
+        queue_overflow="block",
+    ):
         super().__init__(
             application,
             max_applications=max_applications,
+            idle_timeout=idle_timeout,
+            max_queue_size=max_queue_size,
+            queue_overflow=queue_overflow,
         )
         self._sock = sock.socket(sock.AF_INET, sock.SOCK_DGRAM)
         self._sock.setblocking(False)
@@ -183,3 +203,376 @@ async def test_server_delete_instance(server):
         await asyncio.gather(client1_multiple_register(), server.arun())
     except Done:
         pass
+
+
+@pytest.mark.asyncio
+async def test_server_delete_least_recently_used():
+    """
+    The least recently used instance is reclaimed to make room for a new one,
+    and there are never more than max_applications instances.
+    """
+
+    async def app(scope, receive, send):
+        while True:
+            await receive()
+
+    server = Server(app, max_applications=3)
+    try:
+        for scope_id in ("a", "b", "c"):
+            server.get_or_create_application_instance(scope_id, None)
+        server.get_or_create_application_instance("a", None)
+        server.get_or_create_application_instance("d", None)
+        assert list(server.application_instances) == ["c", "a", "d"]
+        server.get_or_create_application_instance("e", None)
+        assert list(server.application_instances) == ["a", "d", "e"]
+    finally:
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_server_application_done():
+    """
+    Finished application instances are removed, and their exceptions handled,
+    as soon as they finish, without the server needing to be running.
+    """
+
+    async def app(scope, receive, send):
+        message = await receive()
+        if message == b"error":
+            raise ValueError("Application error")
+
+    class ExceptionServer(Server):
+        def __init__(self, application):
+            super().__init__(application)
+            self.exceptions = []
+
+        async def application_exception(self, exception, application_details):
+            self.exceptions.append((exception, application_details["scope"]))
+
+    server = ExceptionServer(app)
+    try:
+        server.get_or_create_application_instance("ok", "ok scope").put_nowait(b"ok")
+        server.get_or_create_application_instance("error", "error scope").put_nowait(
+            b"error"
+        )
+        server.get_or_create_application_instance("waiting", "waiting scope")
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert list(server.application_instances) == ["waiting"]
+        [(exception, scope)] = server.exceptions
+        assert isinstance(exception, ValueError)
+        assert scope == "error scope"
+    finally:
+        server.close()
+
+
+def test_server_application_checker_override():
+    """
+    A subclass's own application_checker() is still run alongside handle().
+    """
+    checks = []
+
+    class CheckerServer(StatelessServer):
+        async def handle(self):
+            await asyncio.sleep(0.05)
+
+        async def application_checker(self):
+            while True:
+                checks.append(self.application_checker_interval)
+                await asyncio.sleep(self.application_checker_interval)
+
+    server = CheckerServer(None)
+    server.application_checker_interval = 0.01
+    server.run()
+    assert checks and set(checks) == {0.01}
+
+
+@pytest.mark.asyncio
+async def test_server_idle_timeout():
+    """
+    Application instances are deleted once they have gone idle_timeout
+    seconds without being used.
+    """
+
+    async def app(scope, receive, send):
+        while True:
+            await receive()
+
+    server = Server(app, idle_timeout=0.2)
+    try:
+        a = server.get_or_create_application_instance("a", None)
+        server.get_or_create_application_instance("b", None)
+        b_future = server.application_instances["b"]["future"]
+        await asyncio.sleep(0.12)
+        assert server.get_or_create_application_instance("a", None) is a
+        await asyncio.sleep(0.12)
+        assert list(server.application_instances) == ["a"]
+        assert b_future.cancelled()
+        await asyncio.sleep(0.15)
+        assert not server.application_instances
+        assert server.idle_timer is None
+    finally:
+        server.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "overflow,expected",
+    [("drop_oldest", [b"2", b"3"]), ("drop_newest", [b"1", b"2"])],
+)
+async def test_server_queue_overflow_drop(overflow, expected):
+    """
+    Messages for a full input queue are dropped according to queue_overflow,
+    without blocking the caller, and counted.
+    """
+    received = []
+    started = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await started.wait()
+        while True:
+            received.append(await receive())
+
+    server = Server(app, max_queue_size=2, queue_overflow=overflow)
+    try:
+        input_queue = server.get_or_create_application_instance("a", None)
+        input_queue.put_nowait(b"1")
+        input_queue.put_nowait(b"2")
+        await input_queue.put(b"3")
+        assert server.application_queue_stats() == {
+            "queued": 2,
+            "max_queued": 2,
+            "dropped": 1,
+        }
+        started.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert received == expected
+        assert server.application_queue_stats()["queued"] == 0
+    finally:
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_server_queue_overflow_block():
+    """
+    With the default queue_overflow, putting into a full input queue waits
+    until the application has taken a message out of it.
+    """
+    started = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await started.wait()
+        while True:
+            await receive()
+
+    server = Server(app, max_queue_size=1)
+    try:
+        input_queue = server.get_or_create_application_instance("a", None)
+        await input_queue.put(b"1")
+        with pytest.raises(asyncio.QueueFull):
+            input_queue.put_nowait(b"2")
+        put = asyncio.ensure_future(input_queue.put(b"2"))
+        await asyncio.sleep(0)
+        assert not put.done()
+        started.set()
+        await asyncio.wait_for(put, 1)
+        assert server.application_queue_stats()["dropped"] == 0
+    finally:
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_server_queue_drop_oldest_join():
+    """
+    Messages dropped to make room don't leave join() waiting for them.
+    """
+    queue = ApplicationQueue(1, "drop_oldest")
+    queue.put_nowait(1)
+    queue.put_nowait(2)
+    assert queue.get_nowait() == 2
+    queue.task_done()
+    await asyncio.wait_for(queue.join(), 1)
+
+
+@pytest.mark.asyncio
+async def test_server_queue_stats_idle_timeout():
+    """
+    The count of dropped messages survives idle instances being reclaimed.
+    """
+
+    async def app(scope, receive, send):
+        await asyncio.Event().wait()
+
+    server = Server(
+        app, idle_timeout=0.05, max_queue_size=1, queue_overflow="drop_newest"
+    )
+    try:
+        input_queue = server.get_or_create_application_instance("a", None)
+        input_queue.put_nowait(b"1")
+        input_queue.put_nowait(b"2")
+        await asyncio.sleep(0.1)
+        assert not server.application_instances
+        assert server.application_queue_stats() == {
+            "queued": 0,
+            "max_queued": 0,
+            "dropped": 1,
+        }
+    finally:
+        server.close()
+
+
+def test_server_queue_overflow_invalid():
+    with pytest.raises(ValueError):
+        StatelessServer(None, queue_overflow="explode")
+
+
+def test_sharded_server_consistent_hashing():
+    """
+    scope_ids are spread across every worker, and adding a worker only moves
+    the scope_ids it takes over.
+    """
+    scope_ids = [f"user-{i}" for i in range(1000)]
+    four = ShardedServer(None, workers=4)
+    five = ShardedServer(None, workers=5)
+    assignments = [four.worker_for(scope_id) for scope_id in scope_ids]
+    assert set(assignments) == {0, 1, 2, 3}
+    for scope_id, worker in zip(scope_ids, assignments):
+        assert five.worker_for(scope_id) in (worker, 4)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Workers are forked")
+@pytest.mark.parametrize("transport", [PipeTransport, UnixSocketTransport])
+def test_sharded_server(transport):
+    """
+    Every message for a scope_id is handled, in order, by the same worker
+    process.
+    """
+    results = multiprocessing.get_context("fork").SimpleQueue()
+
+    async def app(scope, receive, send):
+        while True:
+            await send(await receive())
+
+    class ListServer(StatelessServer):
+        """
+        Takes its input from a list rather than the network.
+        """
+
+        async def handle(self):
+            for i in range(20):
+                for scope_id in ("a", "b", "c", "d"):
+                    await self.get_or_create_application_instance(
+                        scope_id, {"scope_id": scope_id}
+                    ).put(i)
+
+        async def application_send(self, scope, message):
+            results.put((os.getpid(), scope["scope_id"], message))
+
+    sharded = ShardedServer(ListServer(app), workers=2, transport=transport())
+    sharded.run()
+    received = {}
+    pids = {}
+    while not results.empty():
+        pid, scope_id, message = results.get()
+        received.setdefault(scope_id, []).append(message)
+        pids.setdefault(scope_id, set()).add(pid)
+    assert received == {scope_id: list(range(20)) for scope_id in "abcd"}
+    assert all(len(scope_pids) == 1 for scope_pids in pids.values())
+    assert os.getpid() not in set.union(*pids.values())
+    assert sharded.server.router is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Workers are forked")
+def test_sharded_server_shutdown_waits():
+    """
+    Workers let application instances finish handling the messages they
+    have been sent before shutting them down.
+    """
+    results = multiprocessing.get_context("fork").SimpleQueue()
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            await asyncio.sleep(0.05)
+            await send(message)
+
+    class ListServer(StatelessServer):
+        async def handle(self):
+            for i in range(5):
+                self.get_or_create_application_instance(i, {}).put_nowait(i)
+
+        async def application_send(self, scope, message):
+            results.put(message)
+
+    ShardedServer(ListServer(app), workers=2).run()
+    received = []
+    while not results.empty():
+        received.append(results.get())
+    assert sorted(received) == list(range(5))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Workers are forked")
+def test_sharded_server_backpressure():
+    """
+    Sending to a worker that has fallen behind waits without blocking the
+    event loop in the process running handle().
+    """
+    release = multiprocessing.get_context("fork").Event()
+    observed = {}
+
+    async def app(scope, receive, send):
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        while True:
+            await receive()
+
+    class ListServer(StatelessServer):
+        async def handle(self):
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            async def send_all():
+                input_queue = self.get_or_create_application_instance("a", {})
+                for _ in range(1000):
+                    await input_queue.put(b"x" * 1024)
+
+            ticking = asyncio.ensure_future(ticker())
+            sending = asyncio.ensure_future(send_all())
+            await asyncio.sleep(0.2)
+            observed["blocked"] = not sending.done()
+            observed["ticks"] = ticks
+            release.set()
+            await asyncio.wait_for(sending, 5)
+            ticking.cancel()
+
+    ShardedServer(ListServer(app, max_queue_size=1), workers=1).run()
+    assert observed["blocked"]
+    assert observed["ticks"] > 5
+
+
+def test_stateless_server_loop_factory(monkeypatch):
+    """
+    StatelessServer.run() runs in a loop made by AsyncToSync.loop_factory.
+    """
+    made = []
+    loops = []
+
+    def loop_factory():
+        loop = asyncio.SelectorEventLoop()
+        made.append(loop)
+        return loop
+
+    class LoopServer(StatelessServer):
+        async def handle(self):
+            loops.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(AsyncToSync, "loop_factory", loop_factory)
+    LoopServer(None).run()
+    assert loops == made
+    assert made[0].is_closed()
@@ -13,13 +13,18 @@ from unittest import TestCase
 
 import pytest
 
+from asgiref.local import Local
 from asgiref.sync import (
     AsyncSingleThreadContext,
+    AsyncToSync,
     SyncToAsync,
+    ThreadHop,
     ThreadSensitiveContext,
+    ThreadSensitivePool,
     async_to_sync,
     iscoroutinefunction,
     sync_to_async,
+    sync_to_async_batch,
 )
 from asgiref.timeout import timeout
 
@@ -174,6 +179,114 @@ async def test_sync_to_async_decorator():
     assert result == 43
 
 
+@pytest.mark.asyncio
+async def test_sync_to_async_batch():
+    """
+    Tests sync_to_async_batch runs every callable in a single trip to the
+    sync thread, in order, and returns their results together.
+    """
+    var = contextvars.ContextVar("var", default=0)
+    threads = []
+
+    def sync_function(value):
+        threads.append(threading.current_thread())
+        var.set(var.get() + value)
+        return var.get()
+
+    results = await sync_to_async_batch(
+        [functools.partial(sync_function, value) for value in (1, 2, 3)]
+    )
+    assert results == [1, 3, 6]
+    assert var.get() == 6
+    assert len(set(threads)) == 1
+    assert threads[0] != threading.current_thread()
+
+    results = await sync_to_async_batch([], thread_sensitive=False)
+    assert results == []
+
+
+@pytest.mark.asyncio
+async def test_sync_to_async_batch_exceptions():
+    """
+    Tests the first exception stops a batch unless return_exceptions is set.
+    """
+    called = []
+
+    def fail():
+        called.append("fail")
+        raise ValueError("boom")
+
+    def succeed():
+        called.append("succeed")
+        return 42
+
+    with pytest.raises(ValueError):
+        await sync_to_async_batch([fail, succeed])
+    assert called == ["fail"]
+
+    results = await sync_to_async_batch(
+        [fail, succeed], thread_sensitive=False, return_exceptions=True
+    )
+    assert isinstance(results[0], ValueError)
+    assert results[1] == 42
+
+    async def async_function():
+        pass
+
+    with pytest.raises(TypeError):
+        await sync_to_async_batch([succeed, async_function])
+
+
+@pytest.mark.asyncio
+async def test_sync_to_async_thread_hop_listeners(monkeypatch):
+    """
+    Tests that thread hop listeners are told when a call is submitted, starts
+    and finishes on the sync thread, and is delivered back to the loop.
+    """
+    monkeypatch.setattr(SyncToAsync, "thread_hop_listeners", [])
+    events = []
+
+    def listener(event, hop):
+        events.append((event, hop, threading.current_thread()))
+
+    SyncToAsync.thread_hop_listeners.append(listener)
+
+    def sync_function():
+        time.sleep(0.01)
+        return threading.current_thread()
+
+    def failing_function():
+        raise ValueError("boom")
+
+    sync_thread = await sync_to_async(sync_function)()
+    with pytest.raises(ValueError):
+        await sync_to_async(failing_function, thread_sensitive=False)()
+
+    main_thread = threading.current_thread()
+    assert [(event, thread) for event, _, thread in events[:4]] == [
+        ("submitted", main_thread),
+        ("started", sync_thread),
+        ("finished", sync_thread),
+        ("delivered", main_thread),
+    ]
+    hop = events[0][1]
+    assert isinstance(hop, ThreadHop)
+    assert all(event_hop is hop for _, event_hop, _ in events[:4])
+    assert hop.func_name.endswith("sync_function")
+    assert hop.executor is SyncToAsync.single_thread_executor
+    assert hop.submitted <= hop.started <= hop.finished <= hop.delivered
+    assert hop.finished - hop.started >= 0.01
+
+    # Exceptions still finish and get delivered.
+    assert [event for event, _, _ in events[4:]] == [
+        "submitted",
+        "started",
+        "finished",
+        "delivered",
+    ]
+    assert events[4][1].executor is None
+
+
 @pytest.mark.asyncio
 async def test_nested_sync_to_async_retains_wrapped_function_attributes():
     """
@@ -675,6 +788,149 @@ async def test_async_single_thread_context_matches_from_async_thread():
     assert result_1["thread"] == result_2["thread"]
 
 
+def test_async_to_sync_persistent_thread_loop(monkeypatch):
+    """
+    Tests that with a per-thread persistent loop, async_to_sync calls from
+    the same thread reuse one event loop, while keeping context propagation,
+    exceptions and thread-sensitive sync code on the calling thread.
+    """
+    monkeypatch.setattr(AsyncToSync, "persistent_loop", "thread")
+    connection = contextvars.ContextVar("connection")
+    connection.set(0)
+    main_thread = threading.current_thread()
+    loops = []
+    sync_threads = []
+
+    def sync_function():
+        sync_threads.append(threading.current_thread())
+
+    async def handler():
+        loops.append(asyncio.get_running_loop())
+        connection.set(connection.get(0) + 1)
+        await sync_to_async(sync_function)()
+
+    async def failing():
+        raise ValueError("boom")
+
+    async_to_sync(handler)()
+    async_to_sync(handler)()
+    with pytest.raises(ValueError):
+        async_to_sync(failing)()
+
+    assert loops[0] is loops[1]
+    assert loops[0].is_running()
+    assert connection.get() == 2
+    assert sync_threads == [main_thread, main_thread]
+
+    # Another thread gets a loop of its own.
+    def other_thread():
+        async_to_sync(handler)()
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    thread.join()
+    assert loops[2] is not loops[0]
+
+
+def test_async_to_sync_persistent_process_loop(monkeypatch):
+    """
+    Tests that with a process-wide persistent loop, all threads share a
+    single event loop.
+    """
+    monkeypatch.setattr(AsyncToSync, "persistent_loop", "process")
+    loops = []
+    sync_threads = []
+
+    def sync_function():
+        sync_threads.append(threading.current_thread())
+
+    async def handler():
+        loops.append(asyncio.get_running_loop())
+        await sync_to_async(sync_function)()
+
+    threads = [
+        threading.Thread(target=async_to_sync(handler)),
+        threading.Thread(target=async_to_sync(handler)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    async_to_sync(handler)()
+
+    assert loops[0] is loops[1] is loops[2]
+    # Thread-sensitive code still runs in each calling thread.
+    assert sync_threads[-1] == threading.current_thread()
+    assert set(sync_threads[:2]) == set(threads)
+    # force_new_loop still gets a brand new loop.
+    async_to_sync(handler, force_new_loop=True)()
+    assert loops[3] is not loops[0]
+
+
+@pytest.mark.parametrize("persistent_loop", ["thread", "process"])
+def test_async_to_sync_persistent_loop_cancels_tasks(monkeypatch, persistent_loop):
+    """
+    Tests that tasks an async_to_sync call starts on a persistent loop, and
+    tasks they start, are cancelled when it finishes, as they are when the
+    call has a loop of its own.
+    """
+    monkeypatch.setattr(AsyncToSync, "persistent_loop", persistent_loop)
+    events = []
+
+    def sync_function():
+        events.append("sync")
+
+    async def background():
+        try:
+            await asyncio.sleep(0.1)
+            await sync_to_async(sync_function)()
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+    async def starts_background():
+        asyncio.ensure_future(background())
+
+    async def handler():
+        asyncio.ensure_future(background())
+        await asyncio.ensure_future(starts_background())
+        await asyncio.sleep(0.01)
+
+    async_to_sync(handler)()
+    assert events == ["cancelled", "cancelled"]
+    time.sleep(0.2)
+    assert events == ["cancelled", "cancelled"]
+
+
+@pytest.mark.parametrize("persistent_loop", [None, "thread", "process"])
+def test_async_to_sync_loop_factory(monkeypatch, persistent_loop):
+    """
+    Tests that the event loops async_to_sync starts are made by
+    AsyncToSync.loop_factory, whether or not they are persistent.
+    """
+    made = []
+
+    def loop_factory():
+        loop = asyncio.SelectorEventLoop()
+        made.append(loop)
+        return loop
+
+    monkeypatch.setattr(AsyncToSync, "loop_factory", loop_factory)
+    monkeypatch.setattr(AsyncToSync, "persistent_loop", persistent_loop)
+    monkeypatch.setattr(AsyncToSync, "process_loop", None)
+    monkeypatch.setattr(AsyncToSync, "thread_loops", threading.local())
+    loops = []
+
+    async def handler():
+        loops.append(asyncio.get_running_loop())
+        return 42
+
+    assert async_to_sync(handler)() == 42
+    assert loops == made
+    if persistent_loop is None:
+        assert loops[0].is_closed()
+
+
 @pytest.mark.asyncio
 async def test_thread_sensitive_with_context_matches():
     result_1 = {}
@@ -727,6 +983,187 @@ async def test_thread_sensitive_context_without_sync_work():
         pass
 
 
+@pytest.mark.asyncio
+async def test_thread_sensitive_pool_pins_contexts():
+    """
+    Tests that with a ThreadSensitivePool, each context runs all its sync code
+    on one worker thread, and no more than max_workers contexts run at once.
+    """
+    pool = ThreadSensitivePool(max_workers=2)
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def store_thread(threads):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.02)
+        threads.append(threading.current_thread())
+        with lock:
+            running -= 1
+
+    async def request(threads):
+        async with ThreadSensitiveContext(pool=pool):
+            await sync_to_async(store_thread)(threads)
+            await sync_to_async(store_thread)(threads)
+
+    results = [[] for _ in range(6)]
+    await asyncio.gather(*(request(threads) for threads in results))
+
+    for threads in results:
+        assert len(threads) == 2
+        assert threads[0] == threads[1]
+        assert threads[0] != threading.current_thread()
+    assert len({threads[0] for threads in results}) == 2
+    assert max_running == 2
+    assert len(pool.idle_workers) == 2
+
+
+@pytest.mark.asyncio
+async def test_thread_sensitive_pool_backpressure(monkeypatch):
+    """
+    Tests that contexts wait for a worker when the pool is saturated, that
+    cancelling a waiting context doesn't lose the worker, and that contexts
+    without sync work never take one.
+    """
+    pool = ThreadSensitivePool(max_workers=1)
+    monkeypatch.setattr(ThreadSensitiveContext, "pool", pool)
+    release = asyncio.Event()
+    threads = []
+
+    def store_thread():
+        threads.append(threading.current_thread())
+
+    async def holder():
+        async with ThreadSensitiveContext():
+            await sync_to_async(store_thread)()
+            await release.wait()
+
+    async def waiter():
+        async with ThreadSensitiveContext():
+            await sync_to_async(store_thread)()
+
+    holder_task = asyncio.create_task(holder())
+    await asyncio.sleep(0.05)
+    assert len(threads) == 1
+
+    # Saturated: these have to wait.
+    cancelled_task = asyncio.create_task(waiter())
+    waiter_task = asyncio.create_task(waiter())
+    await asyncio.sleep(0.05)
+    assert len(threads) == 1
+    cancelled_task.cancel()
+
+    # Contexts with no sync work don't need a worker.
+    async with ThreadSensitiveContext():
+        pass
+
+    release.set()
+    await holder_task
+    await asyncio.wait_for(waiter_task, timeout=1)
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled_task
+    assert threads == [threads[0], threads[0]]
+    assert pool.num_workers == 1
+    assert pool.idle_workers == [pool.idle_workers[0]]
+    assert not pool.waiters
+
+
+@pytest.mark.asyncio
+async def test_thread_sensitive_context_reuses_threads():
+    """
+    Tests that a context's worker thread is reused by later contexts once it
+    exits, with asgiref's thread-local state reset in between.
+    """
+    pool = ThreadSensitivePool(max_idle_workers=1)
+    connection = Local(thread_critical=True)
+
+    def first():
+        connection.value = "first"
+        SyncToAsync.threadlocal.stale = True
+        return threading.current_thread()
+
+    def second():
+        assert not hasattr(connection, "value")
+        assert not hasattr(SyncToAsync.threadlocal, "stale")
+        return threading.current_thread()
+
+    async with ThreadSensitiveContext(pool=pool):
+        first_thread = await sync_to_async(first)()
+    async with ThreadSensitiveContext(pool=pool):
+        second_thread = await sync_to_async(second)()
+    assert first_thread == second_thread
+
+    # Beyond max_idle_workers, released workers are shut down.
+    async def request():
+        async with ThreadSensitiveContext(pool=pool):
+            await sync_to_async(time.sleep)(0.02)
+
+    await asyncio.gather(request(), request(), request())
+    assert len(pool.idle_workers) == 1
+    assert pool.num_workers == 1
+
+
+@pytest.mark.asyncio
+async def test_thread_sensitive_context_fresh_threads():
+    """
+    Tests that, without a pool of its own, each context gets a new thread, so
+    no threading.local data is seen by the next context.
+    """
+    data = threading.local()
+
+    def store():
+        assert not hasattr(data, "value")
+        data.value = True
+        return threading.current_thread()
+
+    threads = []
+    for _ in range(3):
+        async with ThreadSensitiveContext():
+            threads.append(await sync_to_async(store)())
+    assert len(set(threads)) == 3
+    assert not ThreadSensitiveContext.pool.idle_workers
+
+
+def test_thread_sensitive_pool_reset_after_fork(monkeypatch):
+    """
+    Tests that a pool from before a fork is only reset once, however many
+    threads find it out of date at the same time.
+    """
+    pool = ThreadSensitivePool()
+    resets = []
+    reset = pool.reset
+
+    def slow_reset():
+        resets.append(threading.current_thread())
+        time.sleep(0.05)
+        reset()
+
+    monkeypatch.setattr(pool, "reset", slow_reset)
+    pool.pid = -1
+    executors = []
+
+    def acquire():
+        executors.append(async_to_sync(pool.acquire)())
+
+    threads = [threading.Thread(target=acquire) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(resets) == 1
+    assert pool.num_workers == 4
+    for executor in executors:
+        executor.shutdown()
+
+
+def test_thread_sensitive_pool_max_workers():
+    with pytest.raises(ValueError):
+        ThreadSensitivePool(max_workers=0)
+
+
 def cancel_inside_thread_sensitive_context():
     """Cancels a thread-sensitive task parked in async_to_sync, then exits the context"""
     worker_started = threading.Event()
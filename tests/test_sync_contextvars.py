@@ -57,6 +57,49 @@ async def test_sync_to_async_contextvars():
     assert foo.get() == "baz"
 
 
+@pytest.mark.asyncio
+async def test_sync_to_async_contextvars_only_changes_restored():
+    """
+    Tests that only contextvars changed in the called context are set back in
+    the calling context, compared by identity rather than equality.
+    """
+
+    class NoCompare:
+        def __eq__(self, other):
+            raise AssertionError("contextvar values should not be compared")
+
+        __hash__ = object.__hash__
+
+    unchanged: "contextvars.ContextVar[NoCompare]" = contextvars.ContextVar("unchanged")
+    changed: "contextvars.ContextVar[str]" = contextvars.ContextVar("changed")
+    value = NoCompare()
+    unchanged.set(value)
+    changed.set("old")
+
+    def sync_function():
+        assert unchanged.get() is value
+        changed.set("new")
+
+    def sync_function_no_changes():
+        assert unchanged.get() is value
+
+    await sync_to_async(sync_function)()
+    assert unchanged.get() is value
+    assert changed.get() == "new"
+
+    await sync_to_async(sync_function_no_changes)()
+    assert unchanged.get() is value
+    assert changed.get() == "new"
+
+    replacement = NoCompare()
+
+    def sync_function_replaces():
+        unchanged.set(replacement)
+
+    await sync_to_async(sync_function_replaces)()
+    assert unchanged.get() is replacement
+
+
 @pytest.mark.asyncio
 async def test_sync_to_async_contextvars_with_custom_context():
     """
@@ -1,9 +1,21 @@
+import asyncio
+import gc
+import io
+import os
 import sys
+import threading
+import time
 
 import pytest
 
 from asgiref.testing import ApplicationCommunicator
-from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from asgiref.wsgi import (
+    AsgiToWsgi,
+    WsgiInput,
+    WsgiThreadPool,
+    WsgiToAsgi,
+    WsgiToAsgiInstance,
+)
 
 
 @pytest.mark.asyncio
@@ -380,3 +392,912 @@ async def test_duplicate_header_limit_disabled():
         "more_body": True,
     }
     assert (await instance.receive_output(1)) == {"type": "http.response.body"}
+
+
+@pytest.mark.asyncio
+async def test_wsgi_stream_request_body():
+    """
+    Makes sure a streamed body reaches the WSGI application before the
+    whole of it has been received.
+    """
+
+    def wsgi_application(environ, start_response):
+        body = environ["wsgi.input"]
+        assert body.read(6) == b"Hello "
+        start_response("200 OK", [])
+        yield b"first"
+        yield body.read()
+
+    application = WsgiToAsgi(wsgi_application, stream_request_body=True)
+    instance = ApplicationCommunicator(
+        application,
+        {
+            "type": "http",
+            "http_version": "1.0",
+            "method": "POST",
+            "path": "/",
+            "query_string": b"",
+            "headers": [],
+        },
+    )
+    await instance.send_input(
+        {"type": "http.request", "body": b"Hello ", "more_body": True}
+    )
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [],
+    }
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"first",
+        "more_body": True,
+    }
+    await instance.send_input(
+        {"type": "http.request", "body": b"Wor", "more_body": True}
+    )
+    await instance.send_input({"type": "http.request", "body": b"ld!"})
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"World!",
+        "more_body": True,
+    }
+    assert (await instance.receive_output(1)) == {"type": "http.response.body"}
+
+
+def test_wsgi_input_readline():
+    """
+    Makes sure WsgiInput splits lines correctly across http.request messages.
+    """
+    messages = [
+        {"type": "http.request", "body": b"one\ntw", "more_body": True},
+        {"type": "http.request", "body": b"o\n", "more_body": True},
+        {"type": "http.request", "body": b"", "more_body": True},
+        {"type": "http.request", "body": b"three\nfour"},
+    ]
+    messages.reverse()
+    body = WsgiInput(messages.pop)
+    assert body.readline() == b"one\n"
+    assert body.readline(2) == b"tw"
+    assert list(body) == [b"o\n", b"three\n", b"four"]
+    assert body.readline() == b""
+    assert body.read() == b""
+    assert body.read(10) == b""
+
+
+def test_wsgi_input_disconnect():
+    """
+    Makes sure reading a body whose client has gone away raises an error.
+    """
+    messages = [
+        {"type": "http.disconnect"},
+        {"type": "http.request", "body": b"part", "more_body": True},
+    ]
+    body = WsgiInput(messages.pop)
+    assert body.read(4) == b"part"
+    with pytest.raises(OSError):
+        body.read()
+
+
+@pytest.mark.asyncio
+async def test_wsgi_response_buffer():
+    """
+    Makes sure small response chunks are sent together when response
+    buffering is on, and that a large chunk is sent straight away.
+    """
+
+    def wsgi_application(environ, start_response):
+        start_response("200 OK", [])
+        for i in range(5):
+            yield b"%d," % i
+        yield b"x" * 100
+        yield b"end"
+
+    application = WsgiToAsgi(
+        wsgi_application, response_buffer_size=64, response_buffer_delay=10
+    )
+    instance = ApplicationCommunicator(
+        application,
+        {
+            "type": "http",
+            "http_version": "1.0",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [],
+        },
+    )
+    await instance.send_input({"type": "http.request"})
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [],
+    }
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"0,1,2,3,4," + b"x" * 100,
+        "more_body": True,
+    }
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"end",
+        "more_body": True,
+    }
+    assert (await instance.receive_output(1)) == {"type": "http.response.body"}
+
+
+@pytest.mark.asyncio
+async def test_wsgi_response_buffer_delay():
+    """
+    Makes sure buffered response chunks are sent after response_buffer_delay
+    even while the WSGI app is still working on the next one.
+    """
+    finish = threading.Event()
+
+    def wsgi_application(environ, start_response):
+        start_response("200 OK", [])
+        yield b"first "
+        yield b"chunk"
+        finish.wait(5)
+        yield b"last chunk"
+
+    application = WsgiToAsgi(
+        wsgi_application, response_buffer_size=1024, response_buffer_delay=0.01
+    )
+    instance = ApplicationCommunicator(
+        application,
+        {
+            "type": "http",
+            "http_version": "1.0",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [],
+        },
+    )
+    await instance.send_input({"type": "http.request"})
+    assert (await instance.receive_output(1))["type"] == "http.response.start"
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"first chunk",
+        "more_body": True,
+    }
+    finish.set()
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"last chunk",
+        "more_body": True,
+    }
+    assert (await instance.receive_output(1)) == {"type": "http.response.body"}
+
+
+@pytest.mark.asyncio
+async def test_wsgi_send_high_water_mark():
+    """
+    Makes sure the WSGI app keeps producing while the client is slow to
+    receive, but only until send_high_water_mark bytes are waiting.
+    """
+    produced = []
+    sent = []
+    release = asyncio.Event()
+
+    def wsgi_application(environ, start_response):
+        start_response("200 OK", [])
+        for i in range(6):
+            produced.append(i)
+            yield b"%05d" % i
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            await release.wait()
+        sent.append(message)
+
+    application = WsgiToAsgi(wsgi_application, send_high_water_mark=10)
+    task = asyncio.create_task(
+        application(
+            {
+                "type": "http",
+                "http_version": "1.0",
+                "method": "GET",
+                "path": "/",
+                "query_string": b"",
+                "headers": [],
+            },
+            receive,
+            send,
+        )
+    )
+    await asyncio.sleep(0.2)
+    # The first chunk is being sent, and the next two are waiting.
+    assert produced == [0, 1, 2]
+    release.set()
+    await asyncio.wait_for(task, 1)
+    assert produced == [0, 1, 2, 3, 4, 5]
+    assert sent[0]["type"] == "http.response.start"
+    assert b"".join(message.get("body", b"") for message in sent[1:]) == (
+        b"000000000100002000030000400005"
+    )
+    assert sent[-1] == {"type": "http.response.body"}
+
+
+@pytest.mark.asyncio
+async def test_wsgi_send_high_water_mark_buffered():
+    """
+    Makes sure that when the buffer fills up before its flush timer goes
+    off, the timer doesn't go on to flush small chunks buffered after it.
+    """
+    more = threading.Event()
+    end = threading.Event()
+
+    def wsgi_application(environ, start_response):
+        start_response("200 OK", [])
+        yield b"a"
+        yield b"x" * 20
+        more.wait(5)
+        yield b"b"
+        end.wait(5)
+        yield b"c"
+
+    application = WsgiToAsgi(
+        wsgi_application,
+        response_buffer_size=10,
+        response_buffer_delay=0.6,
+        send_high_water_mark=2**16,
+    )
+    instance = ApplicationCommunicator(
+        application,
+        {
+            "type": "http",
+            "http_version": "1.1",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [],
+        },
+    )
+    await instance.send_input({"type": "http.request"})
+    assert (await instance.receive_output(1))["type"] == "http.response.start"
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"a" + b"x" * 20,
+        "more_body": True,
+    }
+    await asyncio.sleep(0.3)
+    more.set()
+    # The first chunk's timer would have gone off by now.
+    assert await instance.receive_nothing(0.45)
+    end.set()
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"bc",
+        "more_body": True,
+    }
+    assert (await instance.receive_output(1)) == {"type": "http.response.body"}
+
+
+@pytest.mark.asyncio
+async def test_wsgi_send_high_water_mark_error():
+    """
+    Makes sure an error sending a pipelined chunk is raised in the WSGI app.
+    """
+
+    def wsgi_application(environ, start_response):
+        start_response("200 OK", [])
+        for _ in range(1000):
+            yield b"chunk"
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            raise OSError("Client went away")
+
+    application = WsgiToAsgi(wsgi_application, send_high_water_mark=2**16)
+    with pytest.raises(OSError):
+        await application(
+            {
+                "type": "http",
+                "http_version": "1.0",
+                "method": "GET",
+                "path": "/",
+                "query_string": b"",
+                "headers": [],
+            },
+            receive,
+            send,
+        )
+
+
+def file_wrapper_application(path):
+    def wsgi_application(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return environ["wsgi.file_wrapper"](open(path, "rb"), 4096)
+
+    return wsgi_application
+
+
+FILE_SCOPE = {
+    "type": "http",
+    "http_version": "1.1",
+    "method": "GET",
+    "path": "/",
+    "query_string": b"",
+    "headers": [],
+}
+
+
+@pytest.mark.asyncio
+async def test_wsgi_file_wrapper_zerocopysend(tmp_path):
+    """
+    Makes sure a wsgi.file_wrapper response is sent as a zero copy send if
+    the server supports it.
+    """
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"x" * 100000)
+    application = WsgiToAsgi(file_wrapper_application(path))
+    instance = ApplicationCommunicator(
+        application,
+        dict(FILE_SCOPE, extensions={"http.response.zerocopysend": {}}),
+    )
+    await instance.send_input({"type": "http.request"})
+    assert (await instance.receive_output(1))["type"] == "http.response.start"
+    message = await instance.receive_output(1)
+    assert message["type"] == "http.response.zerocopysend"
+    assert message["file"].name == str(path)
+    assert message["count"] == 100000
+    assert message["more_body"] is False
+    assert await instance.receive_nothing()
+
+
+@pytest.mark.asyncio
+async def test_wsgi_file_wrapper_pathsend(tmp_path):
+    """
+    Makes sure a wsgi.file_wrapper response is sent as a path send if the
+    server supports it.
+    """
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"x" * 100000)
+    application = WsgiToAsgi(file_wrapper_application(str(path)))
+    instance = ApplicationCommunicator(
+        application, dict(FILE_SCOPE, extensions={"http.response.pathsend": {}})
+    )
+    await instance.send_input({"type": "http.request"})
+    assert (await instance.receive_output(1))["type"] == "http.response.start"
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.pathsend",
+        "path": str(path),
+    }
+    assert await instance.receive_nothing()
+
+
+@pytest.mark.asyncio
+async def test_wsgi_file_wrapper_fallback(tmp_path):
+    """
+    Makes sure a wsgi.file_wrapper response is sent in large blocks if the
+    server supports neither file extension.
+    """
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"x" * 100000)
+    application = WsgiToAsgi(file_wrapper_application(path))
+    instance = ApplicationCommunicator(application, FILE_SCOPE)
+    await instance.send_input({"type": "http.request"})
+    assert (await instance.receive_output(1))["type"] == "http.response.start"
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"x" * 65536,
+        "more_body": True,
+    }
+    assert (await instance.receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"x" * (100000 - 65536),
+        "more_body": True,
+    }
+    assert (await instance.receive_output(1)) == {"type": "http.response.body"}
+
+
+def test_build_environ_headers():
+    """
+    Makes sure headers are translated into environ keys the same way whether
+    or not their names have been seen before.
+    """
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "path": "/",
+        "query_string": b"",
+        "headers": [
+            [b"Content-Type", b"text/plain"],
+            [b"content-length", b"2"],
+            [b"content_length", b"3"],
+            [b"x-forwarded-for", b"10.0.0.1"],
+            [b"accept", b"text/html"],
+            [b"x-forwarded-for", b"10.0.0.2"],
+            [b"accept", b"*/*"],
+        ],
+    }
+    adapter = WsgiToAsgiInstance(None)
+    for _ in range(2):
+        environ = adapter.build_environ(scope, None)
+        assert environ["CONTENT_TYPE"] == "text/plain"
+        assert environ["CONTENT_LENGTH"] == "2"
+        assert environ["HTTP_CONTENT_LENGTH"] == "3"
+        assert environ["HTTP_X_FORWARDED_FOR"] == "10.0.0.1,10.0.0.2"
+        assert environ["HTTP_ACCEPT"] == "text/html,*/*"
+
+
+def test_build_environ_template():
+    """
+    Makes sure environs built from the same template don't share any
+    per-request values.
+    """
+    adapter = WsgiToAsgiInstance(None)
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "https",
+        "server": ["example.com", 443],
+        "path": "/one/",
+        "query_string": b"",
+        "headers": [[b"x-one", b"1"]],
+    }
+    first = adapter.build_environ(scope, None)
+    second = adapter.build_environ(
+        dict(scope, path="/two/", method="POST", headers=[]), None
+    )
+    assert len(adapter.environ_templates) == 1
+    assert first["PATH_INFO"] == "/one/"
+    assert first["HTTP_X_ONE"] == "1"
+    assert second["PATH_INFO"] == "/two/"
+    assert second["REQUEST_METHOD"] == "POST"
+    assert "HTTP_X_ONE" not in second
+    for environ in first, second:
+        assert environ["SERVER_NAME"] == "example.com"
+        assert environ["SERVER_PORT"] == "443"
+        assert environ["SERVER_PROTOCOL"] == "HTTP/1.1"
+        assert environ["wsgi.url_scheme"] == "https"
+    third = adapter.build_environ(dict(scope, http_version="2"), None)
+    assert third["SERVER_PROTOCOL"] == "HTTP/2"
+    assert len(adapter.environ_templates) == 2
+
+
+@pytest.mark.asyncio
+async def test_wsgi_thread_pool():
+    """
+    Makes sure requests run concurrently in a WsgiThreadPool, and that
+    requests over its queue limit get a 503 response.
+    """
+    running = []
+    finish = threading.Event()
+
+    def wsgi_application(environ, start_response):
+        running.append(threading.current_thread())
+        finish.wait(5)
+        start_response("200 OK", [])
+        return [b"OK"]
+
+    pool = WsgiThreadPool(max_workers=2, max_queued=1)
+    application = WsgiToAsgi(wsgi_application, thread_pool=pool)
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "path": "/",
+        "query_string": b"",
+        "headers": [],
+    }
+    instances = [ApplicationCommunicator(application, scope) for _ in range(4)]
+    for instance in instances[:3]:
+        await instance.send_input({"type": "http.request"})
+    # Wait for the first two to both be running, and the third to be queued.
+    while len(running) != 2 or pool.queued != 1:
+        await asyncio.sleep(0.01)
+    await instances[3].send_input({"type": "http.request"})
+    assert (await instances[3].receive_output(1)) == {
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [(b"content-type", b"text/plain")],
+    }
+    assert (await instances[3].receive_output(1)) == {
+        "type": "http.response.body",
+        "body": b"Service Unavailable",
+    }
+    finish.set()
+    for instance in instances[:2]:
+        assert (await instance.receive_output(1))["status"] == 200
+    assert (await instances[2].receive_output(1))["status"] == 200
+    for instance in instances[:3]:
+        await instance.wait()
+    assert pool.admitted == 0
+    assert len(set(running)) == 2
+
+
+def test_wsgi_thread_pool_reset_after_fork(monkeypatch):
+    """
+    Makes sure a pool from before a fork is only reset once, however many
+    threads find it out of date at the same time.
+    """
+    pool = WsgiThreadPool(max_workers=2)
+    resets = []
+    reset = pool.reset
+
+    def slow_reset():
+        resets.append(threading.current_thread())
+        time.sleep(0.05)
+        reset()
+
+    monkeypatch.setattr(pool, "reset", slow_reset)
+    pool.pid = -1
+    threads = [threading.Thread(target=pool.admit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(resets) == 1
+    assert pool.admitted == 4
+    pool.executor.shutdown()
+
+
+def test_wsgi_thread_pool_invalid():
+    with pytest.raises(ValueError):
+        WsgiThreadPool(max_workers=0)
+    with pytest.raises(ValueError):
+        WsgiThreadPool(max_workers=1, max_queued=-1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream_request_body", [False, True])
+async def test_wsgi_disconnect(stream_request_body):
+    """
+    Makes sure WsgiToAsgi stops iterating the response, and closes it, once
+    the client has disconnected.
+    """
+    produced = []
+    closed = threading.Event()
+
+    def wsgi_application(environ, start_response):
+        environ["wsgi.input"].read()
+        start_response("200 OK", [])
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield b"chunk"
+                time.sleep(0.01)
+        finally:
+            closed.set()
+
+    application = WsgiToAsgi(wsgi_application, stream_request_body=stream_request_body)
+    instance = ApplicationCommunicator(
+        application,
+        {
+            "type": "http",
+            "http_version": "1.1",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [],
+        },
+    )
+    await instance.send_input({"type": "http.request"})
+    assert (await instance.receive_output(1))["type"] == "http.response.start"
+    assert (await instance.receive_output(1))["body"] == b"chunk"
+    await instance.send_input({"type": "http.disconnect"})
+    await instance.wait(1)
+    assert closed.is_set()
+    assert len(produced) < 1000
+
+
+@pytest.mark.asyncio
+async def test_wsgi_disconnect_buffered():
+    """
+    Makes sure buffered response body isn't sent after the client has
+    disconnected, when the buffer's flush timer goes off.
+    """
+
+    def wsgi_application(environ, start_response):
+        start_response("200 OK", [])
+        for i in range(1000):
+            yield b"chunk"
+            time.sleep(0.01)
+
+    application = WsgiToAsgi(
+        wsgi_application, response_buffer_size=4096, response_buffer_delay=0.2
+    )
+    instance = ApplicationCommunicator(
+        application,
+        {
+            "type": "http",
+            "http_version": "1.1",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [],
+        },
+    )
+    await instance.send_input({"type": "http.request"})
+    assert (await instance.receive_output(1))["type"] == "http.response.start"
+    await instance.send_input({"type": "http.disconnect"})
+    await instance.wait(1)
+    assert await instance.receive_nothing(0.3)
+
+
+class ClosingIterable:
+    """
+    A WSGI response that only releases its file when closed - it's in a
+    reference cycle, so isn't freed as soon as it's dropped.
+    """
+
+    def __init__(self, path, fail=False):
+        self.file = open(path, "rb")
+        self.fail = fail
+        self.cycle = self
+
+    def __iter__(self):
+        for line in self.file:
+            if self.fail:
+                raise ValueError("Application error")
+            yield line
+
+    def close(self):
+        self.file.close()
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+@pytest.mark.skipif(
+    not os.path.isdir("/proc/self/fd"), reason="Needs /proc/self/fd to count fds"
+)
+@pytest.mark.asyncio
+async def test_wsgi_close_releases_files(tmp_path):
+    """
+    Makes sure WsgiToAsgi closes the application's response however it ends,
+    so no file descriptors are left open.
+    """
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"line\n" * 100)
+
+    def wsgi_application(environ, start_response):
+        kind = environ["PATH_INFO"]
+        if kind == "/truncated/":
+            start_response("200 OK", [("Content-Length", "10")])
+        else:
+            start_response("200 OK", [])
+        if kind == "/file/":
+            return environ["wsgi.file_wrapper"](open(path, "rb"))
+        return ClosingIterable(path, fail=kind == "/error/")
+
+    application = WsgiToAsgi(wsgi_application, thread_pool=WsgiThreadPool(8))
+
+    async def request(kind):
+        async def receive():
+            return {"type": "http.request"}
+
+        async def send(message):
+            pass
+
+        await application(
+            {
+                "type": "http",
+                "http_version": "1.1",
+                "method": "GET",
+                "path": f"/{kind}/",
+                "query_string": b"",
+                "headers": [],
+                "extensions": {"http.response.zerocopysend": {}},
+            },
+            receive,
+            send,
+        )
+
+    kinds = ["full", "truncated", "error", "file"]
+    # Make sure the thread pool and event loop have made any fds they need.
+    await asyncio.gather(*[request("full") for _ in range(8)])
+    gc.collect()
+    gc.disable()
+    try:
+        before = open_fds()
+        results = await asyncio.gather(
+            *[request(kind) for kind in kinds * 50], return_exceptions=True
+        )
+        assert open_fds() == before
+    finally:
+        gc.enable()
+    assert [type(result) for result in results] == [
+        type(None),
+        type(None),
+        ValueError,
+        type(None),
+    ] * 50
+
+
+def asgi_environ(method="GET", path="/", body=b"", **extra):
+    environ = {
+        "REQUEST_METHOD": method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "8000",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(body),
+    }
+    if body:
+        environ["CONTENT_LENGTH"] = str(len(body))
+    environ.update(extra)
+    return environ
+
+
+def call_wsgi(application, environ):
+    responses = []
+
+    def start_response(status, headers, exc_info=None):
+        responses.append((status, headers))
+
+    result = application(environ, start_response)
+    return responses, result
+
+
+def test_asgi_to_wsgi():
+    """
+    Makes sure AsgiToWsgi serves an ASGI application's request and response
+    bodies in chunks.
+    """
+
+    async def application(scope, receive, send):
+        assert scope["type"] == "http"
+        assert scope["method"] == "POST"
+        assert scope["path"] == "/root/中文/"
+        assert scope["root_path"] == "/root"
+        assert "raw_path" not in scope
+        assert scope["query_string"] == b"a=b"
+        assert scope["server"] == ("localhost", 8000)
+        assert scope["client"] == ("127.0.0.1", 0)
+        assert (b"x-test", b"value") in scope["headers"]
+        assert (b"content-length", b"100000") in scope["headers"]
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message["body"])
+            if not message["more_body"]:
+                break
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 201,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body"})
+
+    body = b"x" * 100000
+    responses, result = call_wsgi(
+        AsgiToWsgi(application),
+        asgi_environ(
+            "POST",
+            "/中文/".encode().decode("latin1"),
+            body,
+            SCRIPT_NAME="/root",
+            QUERY_STRING="a=b",
+            HTTP_X_TEST="value",
+        ),
+    )
+    assert responses == [("201 Created", [("content-type", "text/plain")])]
+    chunks = list(result)
+    assert len(chunks) == 2
+    assert b"".join(chunks) == body
+
+
+def test_asgi_to_wsgi_shared_loop():
+    """
+    Makes sure requests from different WSGI threads share one event loop.
+    """
+    loops = []
+
+    async def application(scope, receive, send):
+        loops.append(asyncio.get_running_loop())
+        await send({"type": "http.response.start", "status": 200})
+        await send({"type": "http.response.body", "body": b"OK"})
+
+    def request():
+        responses, result = call_wsgi(AsgiToWsgi(application), asgi_environ())
+        assert b"".join(result) == b"OK"
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loops) == 4
+    assert len(set(loops)) == 1
+
+
+def test_asgi_to_wsgi_error():
+    """
+    Makes sure an error from the ASGI application before it responds is
+    raised to the WSGI server.
+    """
+
+    async def application(scope, receive, send):
+        raise ValueError("Application error")
+
+    with pytest.raises(ValueError):
+        call_wsgi(AsgiToWsgi(application), asgi_environ())
+
+
+def test_asgi_to_wsgi_close():
+    """
+    Makes sure the ASGI application hears about the WSGI server closing the
+    response early.
+    """
+    disconnected = threading.Event()
+
+    async def application(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200})
+        try:
+            while True:
+                await send(
+                    {"type": "http.response.body", "body": b"x", "more_body": True}
+                )
+        except OSError:
+            assert (await receive()) == {"type": "http.disconnect"}
+            disconnected.set()
+
+    responses, result = call_wsgi(AsgiToWsgi(application), asgi_environ())
+    assert next(result) == b"x"
+    result.close()
+    assert disconnected.wait(1)
+
+
+def test_asgi_to_wsgi_raw_path():
+    """
+    Makes sure raw_path is the path as the client sent it, when the WSGI
+    server passes that on.
+    """
+    scopes = []
+
+    async def application(scope, receive, send):
+        scopes.append(scope)
+        await send({"type": "http.response.start", "status": 200})
+        await send({"type": "http.response.body"})
+
+    for key in ("RAW_URI", "REQUEST_URI"):
+        responses, result = call_wsgi(
+            AsgiToWsgi(application),
+            asgi_environ(path="/a/b", **{key: "/a%2Fb?c=d"}),
+        )
+        list(result)
+    assert [scope["path"] for scope in scopes] == ["/a/b", "/a/b"]
+    assert [scope["raw_path"] for scope in scopes] == [b"/a%2Fb", b"/a%2Fb"]
+
+
+def test_asgi_to_wsgi_close_before_iterating():
+    """
+    Makes sure the ASGI application hears about the WSGI server closing the
+    response even if it never started iterating over it.
+    """
+    disconnected = threading.Event()
+
+    async def application(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200})
+        try:
+            await send({"type": "http.response.body", "body": b"x", "more_body": True})
+        except OSError:
+            disconnected.set()
+
+    responses, result = call_wsgi(AsgiToWsgi(application), asgi_environ())
+    result.close()
+    assert disconnected.wait(1)
+    with pytest.raises(StopIteration):
+        next(result)